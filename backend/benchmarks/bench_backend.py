@@ -0,0 +1,233 @@
+"""Backend benchmark suite.
+
+Builds a deterministic multi-user corpus per size, starts fake OpenAI and
+Supabase services, and times the storage, search and tag helpers plus the
+main endpoints through the ASGI app in-process. Results are written as
+JSON; with --baseline, medians are compared and the run exits 1 if any
+benchmark regressed by more than --threshold.
+
+Run from backend/:
+    python benchmarks/bench_backend.py --sizes 100,10000,100000 --output results.json
+    python benchmarks/bench_backend.py --baseline results.json
+1M contacts (--sizes 1000000) needs several GB of RAM and takes minutes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import build_corpus, generate_business_card  # noqa: E402
+from fakes import run_fake_services  # noqa: E402
+
+SEARCH_QUERIES = ["patel", "acme", "san francisco", "fintech", "zzz-no-match"]
+# Not answerable by the local extractor (no name), so it reaches the fake LLM
+EXTRACT_CONTEXT = "met at the conference, talked about hiring and their roadmap"
+
+
+def time_runs(fn, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+async def time_runs_async(fn, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+def summarize(timings: list) -> dict:
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "runs": len(timings),
+    }
+
+
+def bench_functions(main, corpus: dict, repeat: int) -> dict:
+    uid = corpus["primary_user"]
+    results = {}
+    results["load_contacts"] = time_runs(lambda: main.load_contacts(uid), repeat)
+    contacts = main.load_contacts(uid)
+    results["save_contacts"] = time_runs(lambda: main.save_contacts(contacts, uid), repeat)
+    for query in SEARCH_QUERIES:
+        results[f"search_contacts[{query}]"] = time_runs(lambda: main.search_contacts(query, contacts), repeat)
+    results["get_all_tags"] = time_runs(
+        lambda: asyncio.run(main.get_all_tags(if_none_match=None, user_id=uid)), repeat
+    )
+    return results
+
+
+async def bench_endpoints(main, corpus: dict, repeat: int) -> dict:
+    import httpx
+    import jwt
+
+    uid = corpus["primary_user"]
+    headers = {"Authorization": "Bearer " + jwt.encode({"sub": uid}, "bench")}
+    transport = httpx.ASGITransport(app=main.app)
+    results = {}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=600) as client:
+        async def request(method, url, **kwargs):
+            response = await client.request(method, url, **kwargs)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} -> {response.status_code}: {response.text[:200]}")
+            return response
+
+        cases = {
+            "GET /api/contacts": lambda: request("GET", "/api/contacts"),
+            "GET /api/contacts?sort=created&limit=50": lambda: request("GET", "/api/contacts?sort=created&limit=50"),
+            "GET /api/bootstrap?contacts_limit=50": lambda: request("GET", "/api/bootstrap?contacts_limit=50"),
+            "POST /api/search": lambda: request("POST", "/api/search", json={"query": "acme"}),
+            "GET /api/tags": lambda: request("GET", "/api/tags"),
+            "GET /api/contacts/duplicates": lambda: request("GET", "/api/contacts/duplicates"),
+            "POST /api/extract": lambda: request("POST", "/api/extract", json={"context": EXTRACT_CONTEXT}),
+            # Served by the fake Supabase
+            "GET /card/{slug} (supabase)": lambda: request("GET", f"/card/{corpus['supabase_slug']}"),
+            # Misses Supabase and scans every user's business_card.json
+            "GET /card/{slug} (file scan)": lambda: request("GET", f"/card/{corpus['slugs'][-1]}"),
+        }
+        for name, call in cases.items():
+            await call()  # warm up
+            results[name] = await time_runs_async(call, repeat)
+
+        created = []
+
+        async def create():
+            response = await request("POST", "/api/contacts", json={"name": "Bench Contact", "tags": ["bench"]})
+            created.append(response.json()["contact"]["id"])
+
+        async def update():
+            await request("PUT", f"/api/contacts/{created[-1]}", json={"name": "Bench Contact", "priority": 10})
+
+        async def delete():
+            await request("DELETE", f"/api/contacts/{created.pop()}")
+
+        results["POST /api/contacts"] = await time_runs_async(create, repeat)
+        results["PUT /api/contacts/{id}"] = await time_runs_async(update, repeat)
+        results["DELETE /api/contacts/{id}"] = await time_runs_async(delete, repeat)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Benchmarks whose median grew by more than threshold vs the baseline"""
+    regressions = []
+    for size, benches in results["results"].items():
+        for name, stats in benches.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if not base:
+                continue
+            ratio = stats["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+            status = "REGRESSION" if ratio > 1 + threshold else ""
+            print(f"{size:>8} {name:<45} {base['median_ms']:>10.2f} {stats['median_ms']:>10.2f} {ratio:>6.2f}x {status}")
+            if status:
+                regressions.append({"size": size, "name": name, "ratio": round(ratio, 3)})
+    return regressions
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True)
+        return out.stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,10000,100000", help="comma-separated contact counts for the primary user")
+    parser.add_argument("--users", type=int, default=50, help="users per corpus")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added latency of the fake services")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed median slowdown, e.g. 0.2 = 20%%")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    # One user's card is only in (fake) Supabase, the rest only on disk
+    supabase_card = generate_business_card("supabase-only-user", args.seed)
+    data_root = tempfile.mkdtemp(prefix="reachr-bench-")
+
+    with run_fake_services({supabase_card["share_slug"]: supabase_card}, args.latency_ms / 1000) as (fake_url, calls):
+        os.environ.update({
+            "DATA_DIR": os.path.join(data_root, "data"),
+            "OPENAI_API_KEY": "sk-bench",
+            "OPENAI_BASE_URL": f"{fake_url}/v1",
+            "SUPABASE_URL": fake_url,
+            "SUPABASE_SECRET_KEY": "bench",
+            "LOG_LEVEL": "WARNING",
+        })
+        import main as app_main
+
+        results = {
+            "meta": {
+                "created_at": datetime.now().isoformat(),
+                "git_revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "sizes": sizes,
+                "users": args.users,
+                "repeat": args.repeat,
+                "seed": args.seed,
+                "fake_latency_ms": args.latency_ms,
+            },
+            "results": {},
+        }
+        try:
+            for size in sizes:
+                shutil.rmtree(app_main.DATA_DIR, ignore_errors=True)
+                app_main.known_dirs.clear()
+                app_main.known_user_dirs.clear()
+                app_main.known_legacy_dirs.clear()
+                start = time.perf_counter()
+                corpus = build_corpus(app_main.DATA_DIR, size, args.users, args.seed)
+                corpus["supabase_slug"] = supabase_card["share_slug"]
+                print(f"[{size}] corpus of {args.users} users built in {time.perf_counter() - start:.1f}s")
+
+                size_results = bench_functions(app_main, corpus, args.repeat)
+                size_results.update(asyncio.run(bench_endpoints(app_main, corpus, args.repeat)))
+                results["results"][str(size)] = size_results
+                for name, stats in size_results.items():
+                    print(f"[{size}] {name:<45} median {stats['median_ms']:>10.2f} ms  min {stats['min_ms']:>10.2f} ms")
+        finally:
+            shutil.rmtree(data_root, ignore_errors=True)
+        results["meta"]["fake_service_calls"] = dict(calls)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\n{'size':>8} {'benchmark':<45} {'base ms':>10} {'now ms':>10} {'ratio':>7}")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
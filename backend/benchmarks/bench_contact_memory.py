@@ -0,0 +1,94 @@
+"""Memory and speed of cached contacts: plain dicts vs CompactContact records.
+
+Writes --contacts generated contacts to a snapshot, then loads them as the
+list of dicts json produces (what load_contacts returns) and as the
+ContactTable the contact cache holds. For each it reports the memory still
+held after loading (tracemalloc, per contact and per 100k contacts), the
+load time (paid on a cache miss), and the time to search, count tags and
+render a 50-contact page.
+
+Run from backend/:
+    python benchmarks/bench_contact_memory.py --contacts 100000
+"""
+import argparse
+import gc
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_contacts, write_contacts_file  # noqa: E402
+
+USER_ID = "memory-user"
+
+
+def measure_held(load) -> tuple:
+    """(object, bytes still allocated after load())"""
+    gc.collect()
+    tracemalloc.start()
+    obj = load()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, held
+
+
+def median_ms(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="reachr-memory-")
+    os.environ.update({"DATA_DIR": data_dir, "OPENAI_API_KEY": "sk-bench", "LOG_LEVEL": "WARNING"})
+    import main as app_main
+
+    try:
+        user_dir = app_main.sharded_user_dir(USER_ID)
+        os.makedirs(user_dir)
+        write_contacts_file(os.path.join(user_dir, "contacts.json"), generate_contacts(args.contacts, USER_ID, args.seed))
+
+        print(f"{args.contacts} contacts, median of {args.runs} runs")
+        print(f"{'representation':<16} {'bytes/contact':>14} {'MB/100k':>8} {'load ms':>8} "
+              f"{'search ms':>10} {'tags ms':>8} {'page ms':>8}")
+        baseline = None
+        loaders = [
+            ("dicts", lambda: app_main.read_contacts(USER_ID)),
+            ("compact", lambda: app_main.ContactTable(app_main.read_contacts(USER_ID))),
+        ]
+        for name, load in loaders:
+            contacts, held = measure_held(load)
+            load_ms = median_ms(load, args.runs)
+            page = app_main.paginate_contacts(contacts, "created", None, 50, None)
+            search_ms = median_ms(lambda: app_main.search_contacts("acme", contacts), args.runs)
+            tags_ms = median_ms(lambda: app_main.build_tag_list(contacts, None), args.runs)
+            page_ms = median_ms(lambda: app_main.FastJSONResponse(page).body, args.runs)
+            per_contact = held / args.contacts
+            note = f"  ({held / baseline:.0%} of dicts)" if baseline else ""
+            baseline = baseline or held
+            print(f"{name:<16} {per_contact:>14.0f} {per_contact * 100000 / 2**20:>8.1f} {load_ms:>8.0f} "
+                  f"{search_ms:>10.1f} {tags_ms:>8.1f} {page_ms:>8.2f}{note}")
+            del contacts, page
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
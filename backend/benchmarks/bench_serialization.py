@@ -0,0 +1,52 @@
+"""Serialization and compression benchmark for contact list payloads.
+
+Compares the default FastAPI path (jsonable_encoder + json.dumps) with
+FastJSONResponse (orjson), and reports bytes on the wire for identity,
+gzip and brotli at 1k / 10k / 100k synthetic contacts.
+
+Run from backend/:  python benchmarks/bench_serialization.py [sizes...]
+"""
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from corpus import generate_contacts  # noqa: E402
+from main import FastJSONResponse, brotli, orjson  # noqa: E402
+
+
+def best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(sizes):
+    print(f"orjson={'yes' if orjson else 'no'} brotli={'yes' if brotli else 'no'}")
+    print(f"{'contacts':>9} {'default ms':>11} {'fast ms':>9} {'speedup':>8} "
+          f"{'raw KB':>9} {'gzip KB':>9} {'br KB':>9}")
+    for n in sizes:
+        payload = {"contacts": list(generate_contacts(n))}
+        default_s, default_body = best_of(lambda: JSONResponse(jsonable_encoder(payload)).body)
+        fast_s, fast_body = best_of(lambda: FastJSONResponse(payload).body)
+        assert json.loads(default_body) == json.loads(fast_body)
+
+        gz = len(gzip.compress(fast_body, compresslevel=6))
+        br = len(brotli.compress(fast_body, quality=4)) if brotli else float("nan")
+        print(f"{n:>9} {default_s * 1000:>11.1f} {fast_s * 1000:>9.1f} "
+              f"{default_s / fast_s:>7.1f}x {len(fast_body) / 1024:>9.0f} "
+              f"{gz / 1024:>9.0f} {br / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
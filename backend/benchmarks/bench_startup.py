@@ -0,0 +1,109 @@
+"""Cold-start cost of the API: import time of main.py and time to first response.
+
+Imports main in a fresh interpreter --runs times under `python -X importtime`
+and reports the median cumulative import time of each module main imports
+directly (a module already loaded by an earlier import counts there), main's
+own module body, and the total. With --serve it also starts `python main.py`
+--runs times and measures how long until GET / answers.
+
+Run from backend/:
+    python benchmarks/bench_startup.py --runs 5 --top 12
+    python benchmarks/bench_startup.py --serve
+"""
+import argparse
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def bench_env(data_dir: str, **extra) -> dict:
+    env = dict(os.environ)
+    env.update({"DATA_DIR": data_dir, "OPENAI_API_KEY": "sk-bench", "LOG_LEVEL": "WARNING"}, **extra)
+    return env
+
+
+def import_times(env: dict) -> dict:
+    """Cumulative microseconds per top-level module imported, plus main's self time"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), len(match[3]), match[4]
+        if name == "main":
+            times["(main self)"] = self_us
+            times["(total)"] = cumulative_us
+        elif indent == 2:
+            # Direct children of main; modules already imported elsewhere don't appear
+            times[name] = cumulative_us
+    return times
+
+
+def time_to_first_response(env: dict) -> float:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=BACKEND_DIR, env=dict(env, PORT=str(port)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError("server exited during startup")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1):
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="modules to list, slowest first")
+    parser.add_argument("--serve", action="store_true", help="also measure time to first HTTP response")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="reachr-startup-")
+    try:
+        env = bench_env(data_dir)
+        runs = [import_times(env) for _ in range(args.runs)]
+        medians = {name: statistics.median(run.get(name, 0) for run in runs) for name in runs[0]}
+        total = medians.pop("(total)")
+        own = medians.pop("(main self)")
+
+        print(f"import main: {total / 1000:.0f} ms median over {args.runs} runs")
+        print(f"{'module':<28} {'ms':>8} {'share':>7}")
+        for name, us in sorted(medians.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"{name:<28} {us / 1000:>8.1f} {us / total:>6.0%}")
+        print(f"{'(main module body)':<28} {own / 1000:>8.1f} {own / total:>6.0%}")
+
+        if args.serve:
+            samples = [time_to_first_response(env) for _ in range(args.runs)]
+            print(f"python main.py to first response: {statistics.median(samples) * 1000:.0f} ms median "
+                  f"(min {min(samples) * 1000:.0f} ms)")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Write amplification of contact edits, with and without group commit.
+
+Gives one user --contacts contacts, then sends --bursts bursts of
+--concurrency simultaneous PUT /api/contacts/{id} (adding a tag, as bulk
+tagging in the app does) through the ASGI app in-process. Each burst is
+run once per configuration: max batch 1 (one write per edit, the
+behaviour before coalescing) and each --windows value. The report
+compares contacts writes (snapshot rewrites or journal appends), bytes
+written per edit (contacts, journal and change log) and request latency.
+Set CONTACT_STORAGE=snapshot to measure whole-file rewrites.
+
+Run from backend/:
+    python benchmarks/bench_write_coalescing.py --contacts 2000 --concurrency 20 --windows 0,5,20,50
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_contacts, write_contacts_file  # noqa: E402
+
+USER_ID = "coalesce-user"
+
+
+def io_totals(main) -> dict:
+    """(writes, bytes) saved so far per JSON file kind, from the json_io_bytes histogram"""
+    totals = {}
+    for (op, kind), counts in list(main.JSON_IO_BYTES.values.items()):
+        if op == "save":
+            totals[kind] = (sum(counts[:-1]), counts[-1])
+    return totals
+
+
+async def run_config(main, contacts: list, args, window_ms: float, max_batch: int) -> dict:
+    import httpx
+    import jwt
+
+    user_dir = main.sharded_user_dir(USER_ID)
+    shutil.rmtree(user_dir, ignore_errors=True)
+    os.makedirs(user_dir)
+    write_contacts_file(os.path.join(user_dir, "contacts.json"), contacts)
+    main.contact_writes.window_ms = window_ms
+    main.contact_writes.max_batch = max_batch
+
+    rnd = random.Random(args.seed)
+    headers = {"Authorization": "Bearer " + jwt.encode({"sub": USER_ID}, "bench")}
+    transport = httpx.ASGITransport(app=main.app)
+    latencies = []
+    before = io_totals(main)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=120) as client:
+        async def tag(contact: dict, n: int):
+            start = time.perf_counter()
+            body = {"name": contact["name"], "tags": contact["tags"] + [f"bulk-{n}"]}
+            response = await client.put(f"/api/contacts/{contact['id']}", json=body)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        began = time.perf_counter()
+        for n in range(args.bursts):
+            targets = rnd.sample(contacts, args.concurrency)
+            await asyncio.gather(*(tag(contact, n) for contact in targets))
+        elapsed = time.perf_counter() - began
+
+    after = io_totals(main)
+    edits = args.bursts * args.concurrency
+    delta = {kind: [after[kind][i] - before.get(kind, (0, 0))[i] for i in (0, 1)] for kind in after}
+    writes = sum(delta.get(kind, (0, 0))[0] for kind in ("contacts", "journal"))
+    written = sum(delta.get(kind, (0, 0))[1] for kind in ("contacts", "journal", "change_log"))
+    latencies.sort()
+    return {
+        "edits": edits,
+        "file_writes": writes,
+        "edits_per_write": edits / writes if writes else 0,
+        "bytes_per_edit": written / edits,
+        "edits_per_sec": edits / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20, help="simultaneous edits per burst")
+    parser.add_argument("--bursts", type=int, default=10)
+    parser.add_argument("--windows", default="0,5,20,50", help="CONTACT_WRITE_WINDOW_MS values to compare")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    data_root = tempfile.mkdtemp(prefix="reachr-coalesce-")
+    os.environ.update({"DATA_DIR": data_root, "OPENAI_API_KEY": "sk-bench", "LOG_LEVEL": "WARNING"})
+    import main as app_main
+
+    contacts = list(generate_contacts(args.contacts, USER_ID, args.seed))
+    logical = statistics.mean(len(app_main.json.dumps(c, indent=2)) for c in contacts)
+    configs = [("before (max batch 1)", 0.0, 1)]
+    configs += [(f"window {w}ms", float(w), app_main.CONTACT_WRITE_MAX_BATCH) for w in args.windows.split(",") if w]
+
+    print(f"{args.contacts} contacts, {args.bursts} bursts x {args.concurrency} concurrent edits; "
+          f"~{logical:.0f} bytes per edited contact")
+    print(f"{'config':<22} {'writes':>7} {'edits/write':>12} {'KB/edit':>9} {'amplif.':>9} "
+          f"{'edits/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    try:
+        for name, window_ms, max_batch in configs:
+            r = asyncio.run(run_config(app_main, contacts, args, window_ms, max_batch))
+            print(f"{name:<22} {r['file_writes']:>7} {r['edits_per_write']:>12.1f} "
+                  f"{r['bytes_per_edit'] / 1024:>9.1f} {r['bytes_per_edit'] / logical:>8.0f}x "
+                  f"{r['edits_per_sec']:>8.0f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}")
+    finally:
+        shutil.rmtree(data_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
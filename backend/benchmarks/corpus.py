@@ -0,0 +1,161 @@
+"""Deterministic synthetic contacts, preferences and business cards.
+
+Records use the same schema main.py stores in contacts.json and
+business_card.json, so benchmarks exercise the real load/search/tag code.
+The same seed always produces the same corpus.
+"""
+import hashlib
+import json
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+
+FIRST_NAMES = [
+    "Alex", "Sam", "Priya", "Jordan", "Mei", "Omar", "Lena", "Diego", "Ava", "Noah",
+    "Fatima", "Kenji", "Chloe", "Mateo", "Zara", "Lukas", "Amara", "Ethan", "Sofia", "Ravi",
+    "Hannah", "Tomás", "Ingrid", "Kwame", "Yuki", "Elena", "Marcus", "Aisha", "Felix", "Nadia",
+]
+LAST_NAMES = [
+    "Kim", "Patel", "Garcia", "Smith", "Chen", "Nguyen", "Okafor", "Rossi", "Müller", "Haddad",
+    "Johansson", "Tanaka", "Dubois", "Silva", "Cohen", "O'Brien", "Kowalski", "Mensah", "Singh", "Lopez",
+]
+COMPANY_WORDS = [
+    "Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli", "Vandelay", "Soylent", "Cyberdyne",
+    "Northwind", "Contoso", "Fabrikam", "Tailspin", "Blue Yonder", "Pied Piper", "Aperture", "Wonka", "Tyrell", "Monarch",
+]
+COMPANY_SUFFIXES = ["Inc", "LLC", "Labs", "Capital", "Health", "Partners", "Group", "Technologies", "Ventures", ""]
+ROLES = [
+    "Founder", "CEO", "CTO", "VP Engineering", "Product Manager", "Software Engineer", "Data Scientist",
+    "Investor", "Partner", "Designer", "Head of Sales", "Marketing Director", "Recruiter", "Consultant",
+]
+INDUSTRIES = ["tech", "finance", "healthcare", "real_estate", "legal", "marketing", "education", "general"]
+LOCATIONS = [
+    "San Francisco", "New York", "London", "Berlin", "Toronto", "Singapore", "Austin", "Paris",
+    "Bangalore", "Tel Aviv", "São Paulo", "Sydney",
+]
+TAGS = [
+    "ai", "saas", "fintech", "vc", "hiring", "b2b", "b2c", "climate", "crypto", "healthtech", "edtech",
+    "marketplace", "seed", "series a", "angel", "advisor", "mentor", "partner", "potential client",
+    "follow up", "conference", "referral", "linkedin", "introduction", "enterprise", "startup", "ml",
+    "devops", "security", "mobile", "design", "growth", "sales", "marketing", "open source", "remote",
+    "product", "data", "cloud", "payments",
+]
+EVENTS = ["TechCrunch Disrupt", "Web Summit", "a YC demo day", "SaaStr", "a dinner", "a meetup", "CES", "a coffee chat"]
+TOPICS = [
+    "fundraising", "hiring senior engineers", "their AI roadmap", "expanding to Europe", "a pilot project",
+    "pricing strategy", "an intro to their investors", "open-source tooling", "enterprise sales", "a partnership",
+]
+EPOCH = datetime(2023, 1, 1)
+
+
+def seeded_uuid(rnd: random.Random) -> str:
+    return str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+
+
+def generate_contact(rnd: random.Random, index: int, user_id: str) -> dict:
+    """One contact shaped like the records create_contact stores"""
+    first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+    company = f"{rnd.choice(COMPANY_WORDS)} {rnd.choice(COMPANY_SUFFIXES)}".strip()
+    created = EPOCH + timedelta(minutes=index * 7 + rnd.randint(0, 6))
+    domain = company.split()[0].lower() + ".com"
+    handle = f"{first}.{last}".lower().replace("'", "")
+    return {
+        "name": f"{first} {last}",
+        "email": f"{handle}{index}@{domain}",
+        "phone": f"+1{rnd.randint(200, 999)}{rnd.randint(200, 999)}{rnd.randint(0, 9999):04d}",
+        "company": company,
+        "role": rnd.choice(ROLES),
+        "industry": rnd.choice(INDUSTRIES),
+        "location": rnd.choice(LOCATIONS),
+        "linkedin_url": f"https://linkedin.com/in/{handle}-{index}" if rnd.random() < 0.6 else None,
+        "tags": rnd.sample(TAGS, rnd.randint(10, 20)),
+        "raw_context": (
+            f"Met {first} at {rnd.choice(EVENTS)}. Talked about {rnd.choice(TOPICS)} "
+            f"and {rnd.choice(TOPICS)}. Follow up in {rnd.randint(1, 8)} weeks."
+        ),
+        "met_date": created.date().isoformat(),
+        "meeting_location": rnd.choice(LOCATIONS),
+        "priority": rnd.randint(1, 100),
+        "id": seeded_uuid(rnd),
+        "user_id": user_id,
+        "created_at": created.isoformat(),
+        "updated_at": created.isoformat(),
+    }
+
+
+def generate_contacts(count: int, user_id: str = "bench-user", seed: int = 1):
+    """Yield count contacts for user_id; the same seed gives the same contacts"""
+    rnd = random.Random(f"{seed}:{user_id}")
+    for index in range(count):
+        yield generate_contact(rnd, index, user_id)
+
+
+def generate_business_card(user_id: str, seed: int = 1) -> dict:
+    rnd = random.Random(f"{seed}:{user_id}:card")
+    first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+    return {
+        "full_name": f"{first} {last}",
+        "email": f"{first.lower()}@example.com",
+        "phone": f"+1415555{rnd.randint(0, 9999):04d}",
+        "title": rnd.choice(ROLES),
+        "company": rnd.choice(COMPANY_WORDS),
+        "website": "https://example.com",
+        "linkedin_url": None,
+        "avatar_url": None,
+        "template_id": "classic",
+        "accent_color": "#7C3AED",
+        "id": seeded_uuid(rnd),
+        "user_id": user_id,
+        "share_slug": f"{first.lower()}-{last.lower().replace(chr(39), '')}-{rnd.getrandbits(24):06x}",
+        "created_at": EPOCH.isoformat(),
+        "updated_at": EPOCH.isoformat(),
+    }
+
+
+def user_ids(count: int, seed: int = 1) -> list:
+    rnd = random.Random(f"{seed}:users")
+    return [seeded_uuid(rnd) for _ in range(count)]
+
+
+def user_dir(data_dir: str, user_id: str) -> str:
+    """A user's directory in main.py's sharded layout (users/<ab>/<cd>/<user_id>)"""
+    digest = hashlib.sha1(user_id.encode()).hexdigest()
+    return os.path.join(data_dir, "users", digest[:2], digest[2:4], user_id)
+
+
+def write_contacts_file(path: str, contacts):
+    """Write contacts in contacts.json layout without holding them all in memory"""
+    with open(path, "w") as f:
+        f.write('{\n  "seq": 0,\n  "contacts": [')
+        for i, contact in enumerate(contacts):
+            f.write(",\n    " if i else "\n    ")
+            f.write(json.dumps(contact))
+        f.write("\n  ]\n}")
+
+
+def build_corpus(data_dir: str, size: int, users: int = 50, seed: int = 1, background_size: int = 200) -> dict:
+    """Write a multi-user data directory and describe it
+
+    The first user ("primary") has `size` contacts; the others have up to
+    background_size each. Every user gets preferences and a business card.
+    """
+    ids = user_ids(users, seed)
+    rnd = random.Random(f"{seed}:sizes")
+    slugs = []
+    for n, user_id in enumerate(ids):
+        path = user_dir(data_dir, user_id)
+        os.makedirs(path, exist_ok=True)
+        count = size if n == 0 else rnd.randint(background_size // 4, background_size)
+        write_contacts_file(os.path.join(path, "contacts.json"), generate_contacts(count, user_id, seed))
+        with open(os.path.join(path, "preferences.json"), "w") as f:
+            json.dump({
+                "industry": "tech",
+                "custom_tags": ["investor", "hiring"],
+                "suggested_tags": TAGS[:15],
+            }, f, indent=2)
+        card = generate_business_card(user_id, seed)
+        with open(os.path.join(path, "business_card.json"), "w") as f:
+            json.dump(card, f, indent=2)
+        slugs.append(card["share_slug"])
+    return {"primary_user": ids[0], "user_ids": ids, "slugs": slugs}
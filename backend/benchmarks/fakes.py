@@ -0,0 +1,93 @@
+"""Local stand-ins for OpenAI and Supabase.
+
+run_fake_services() serves both from one uvicorn instance in a background
+thread. Point main.py at it with OPENAI_BASE_URL=<url>/v1 and
+SUPABASE_URL=<url> before importing main. Responses are canned, with an
+optional fixed latency to mimic the real round trip.
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+EXTRACTION_RESULT = {
+    "name": "Jordan Patel",
+    "email": "jordan@acme.com",
+    "phone": "+14155550100",
+    "company": "Acme",
+    "role": "CTO",
+    "industry": "tech",
+    "location": "San Francisco",
+    "tags": ["ai", "saas", "cto", "hiring", "b2b", "startup", "conference", "follow up", "ml", "cloud"],
+}
+
+
+def build_fake_app(cards_by_slug: dict, latency_seconds: float) -> FastAPI:
+    fake = FastAPI()
+    fake.state.calls = {"chat": 0, "transcription": 0, "supabase": 0}
+
+    async def delay():
+        if latency_seconds:
+            await asyncio.sleep(latency_seconds)
+
+    @fake.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        fake.state.calls["chat"] += 1
+        await delay()
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(EXTRACTION_RESULT)},
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150},
+        }
+
+    @fake.post("/v1/audio/transcriptions")
+    async def transcriptions():
+        fake.state.calls["transcription"] += 1
+        await delay()
+        return {"text": "Met Jordan Patel from Acme, CTO, interested in hiring"}
+
+    @fake.get("/rest/v1/user_business_cards")
+    async def business_cards(share_slug: str = ""):
+        fake.state.calls["supabase"] += 1
+        await delay()
+        slug = share_slug[3:] if share_slug.startswith("eq.") else share_slug
+        card = cards_by_slug.get(slug)
+        return [card] if card else []
+
+    return fake
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def run_fake_services(cards_by_slug: dict = None, latency_seconds: float = 0.0):
+    """Serve fake OpenAI + Supabase; yields (base_url, call counters)"""
+    fake = build_fake_app(cards_by_slug if cards_by_slug is not None else {}, latency_seconds)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(fake, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}", fake.state.calls
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
@@ -0,0 +1,307 @@
+"""Concurrent load test and SLO report for the API.
+
+Starts the API the way `python main.py` does (one uvicorn process) on a
+seeded multi-user corpus, with OpenAI and Supabase replaced by the fakes.
+Many virtual users then replay a weighted request mix through one asyncio
+httpx client. Use --target to load an already running server instead.
+
+The report covers throughput and p50/p95/p99 latency per route, and SLO
+pass/fail per route. It also shows event-loop stalls, read from the
+server's /metrics, and this generator's own loop lag; if the generator lags,
+its latencies are unreliable.
+
+Run from backend/:
+    python benchmarks/loadtest.py --vus 50 --duration 30
+    python benchmarks/loadtest.py --mix search=50,tags=20,card=30 --slo-p95-ms 300
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import shutil
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+
+from corpus import FIRST_NAMES, LAST_NAMES, TAGS, build_corpus, generate_business_card  # noqa: E402
+from fakes import free_port, run_fake_services  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MIX = "search=35,list=10,tags=15,card=10,extract=5,create=10,update=10,delete=5"
+SEARCH_TERMS = ["acme", "patel", "san francisco", "fintech", "cto", "hiring", "globex", "nobody-matches"]
+EXTRACT_CONTEXT = "met at the conference, talked about hiring and their roadmap"
+
+
+class VirtualUser:
+    def __init__(self, vu_id: int, user_id: str, slugs: list, rnd: random.Random):
+        self.vu_id = vu_id
+        self.headers = {"Authorization": "Bearer " + jwt.encode({"sub": user_id}, "loadtest")}
+        self.slugs = slugs
+        self.rnd = rnd
+        self.created = []
+
+    def request_for(self, op: str):
+        """(route label, method, url, json body) for one operation"""
+        rnd = self.rnd
+        if op == "search":
+            return "POST /api/search", "POST", "/api/search", {"query": rnd.choice(SEARCH_TERMS)}
+        if op == "list":
+            return "GET /api/contacts?sort=created", "GET", "/api/contacts?sort=created&limit=50", None
+        if op == "tags":
+            return "GET /api/tags", "GET", "/api/tags", None
+        if op == "card":
+            return "GET /card/{slug}", "GET", f"/card/{rnd.choice(self.slugs)}", None
+        if op == "extract":
+            return "POST /api/extract", "POST", "/api/extract", {"context": EXTRACT_CONTEXT}
+        body = {
+            "name": f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}",
+            "company": "Loadtest Inc",
+            "tags": rnd.sample(TAGS, 10),
+            "priority": rnd.randint(1, 100),
+        }
+        if op == "create" or not self.created:
+            return "POST /api/contacts", "POST", "/api/contacts", body
+        if op == "update":
+            contact_id = rnd.choice(self.created)
+            return "PUT /api/contacts/{id}", "PUT", f"/api/contacts/{contact_id}", body
+        contact_id = self.created.pop(rnd.randrange(len(self.created)))
+        return "DELETE /api/contacts/{id}", "DELETE", f"/api/contacts/{contact_id}", None
+
+
+async def run_vu(vu: VirtualUser, client: httpx.AsyncClient, ops: list, weights: list,
+                 deadline: float, think_seconds: float, samples: dict):
+    while time.monotonic() < deadline:
+        op = vu.rnd.choices(ops, weights)[0]
+        route, method, url, body = vu.request_for(op)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, json=body, headers=vu.headers)
+            ok = response.status_code < 400 or (route == "GET /card/{slug}" and response.status_code == 404)
+            if ok and route == "POST /api/contacts":
+                vu.created.append(response.json()["contact"]["id"])
+        except httpx.HTTPError:
+            ok = False
+        latency = time.perf_counter() - start
+        samples.setdefault(route, []).append((latency, ok))
+        if think_seconds:
+            await asyncio.sleep(vu.rnd.uniform(0, 2 * think_seconds))
+
+
+async def monitor_own_loop(stop: asyncio.Event, lags: list, interval: float = 0.05):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - start - interval))
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def parse_metrics(text: str) -> dict:
+    """Event-loop stall metrics from the server's /metrics text"""
+    result = {"stalls": 0.0, "lag_sum": 0.0, "lag_count": 0.0, "lag_buckets": {}}
+    for line in text.splitlines():
+        if line.startswith("event_loop_stalls_total"):
+            result["stalls"] = float(line.split()[-1])
+        elif line.startswith("event_loop_lag_seconds_sum"):
+            result["lag_sum"] = float(line.split()[-1])
+        elif line.startswith("event_loop_lag_seconds_count"):
+            result["lag_count"] = float(line.split()[-1])
+        elif line.startswith("event_loop_lag_seconds_bucket"):
+            le = re.search(r'le="([^"]+)"', line).group(1)
+            result["lag_buckets"][le] = float(line.split()[-1])
+    return result
+
+
+def loop_report(before: dict, after: dict) -> dict:
+    count = after["lag_count"] - before["lag_count"]
+    buckets = {le: after["lag_buckets"][le] - before["lag_buckets"].get(le, 0) for le in after["lag_buckets"]}
+    p99_bound = None
+    for le, cumulative in buckets.items():
+        if count and cumulative >= 0.99 * count:
+            p99_bound = le
+            break
+    return {
+        "stalls": int(after["stalls"] - before["stalls"]),
+        "mean_lag_ms": round((after["lag_sum"] - before["lag_sum"]) / count * 1000, 2) if count else 0.0,
+        "p99_lag_le_seconds": p99_bound,
+    }
+
+
+def start_server(port: int, env: dict, log_file) -> subprocess.Popen:
+    """Launch main.py the way production does (python main.py)"""
+    return subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env, "PORT": str(port)},
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
+    )
+
+
+async def wait_for_server(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+async def run_load(args, base_url: str, user_ids: list, slugs: list) -> dict:
+    mix = dict((k, float(v)) for k, v in (item.split("=") for item in args.mix.split(",")))
+    ops, weights = list(mix), list(mix.values())
+    rnd = random.Random(args.seed)
+    vus = [
+        VirtualUser(n, user_ids[n % len(user_ids)], slugs, random.Random(rnd.getrandbits(64)))
+        for n in range(args.vus)
+    ]
+    samples = {}
+    own_lags = []
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=args.vus, max_keepalive_connections=args.vus)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        before = parse_metrics((await client.get("/metrics")).text)
+        monitor = asyncio.create_task(monitor_own_loop(stop, own_lags))
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            run_vu(vu, client, ops, weights, deadline, args.think_ms / 1000, samples) for vu in vus
+        ))
+        elapsed = time.monotonic() - started
+        stop.set()
+        await monitor
+        after = parse_metrics((await client.get("/metrics")).text)
+
+    routes = {}
+    total = 0
+    for route, values in sorted(samples.items()):
+        latencies = sorted(v[0] * 1000 for v in values)
+        errors = sum(1 for v in values if not v[1])
+        total += len(values)
+        stats = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 2),
+            "error_rate": round(errors / len(values), 4),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2),
+        }
+        stats["slo_met"] = stats["p95_ms"] <= args.slo_p95_ms and stats["error_rate"] <= args.slo_error_rate
+        routes[route] = stats
+
+    own_lags.sort()
+    return {
+        "config": {k: v for k, v in vars(args).items()},
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "rps": round(total / elapsed, 2),
+        "routes": routes,
+        "server_event_loop": loop_report(before, after),
+        "generator_loop_p99_ms": round(percentile(own_lags, 99) * 1000, 2),
+    }
+
+
+def print_report(report: dict, args):
+    print(f"\n{report['requests']} requests in {report['duration_s']}s = {report['rps']} req/s "
+          f"({args.vus} virtual users)\n")
+    print(f"{'route':<32} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  SLO")
+    for route, s in report["routes"].items():
+        print(f"{route:<32} {s['requests']:>7} {s['rps']:>8} {s['error_rate'] * 100:>5.1f}% "
+              f"{s['p50_ms']:>8} {s['p95_ms']:>8} {s['p99_ms']:>8} {s['max_ms']:>8}  "
+              f"{'ok' if s['slo_met'] else 'MISSED'}")
+    loop = report["server_event_loop"]
+    print(f"\nServer event loop: {loop['stalls']} stalls >= {args.stall_threshold_ms}ms, "
+          f"mean lag {loop['mean_lag_ms']}ms, p99 lag <= {loop['p99_lag_le_seconds']}s")
+    if loop["stalls"]:
+        print("  STALLS DETECTED: something blocks the event loop (see 'Event loop stalled' in the server log)")
+    if report["generator_loop_p99_ms"] > args.stall_threshold_ms:
+        print(f"  Warning: the load generator itself lagged (p99 {report['generator_loop_p99_ms']}ms); "
+              "reduce --vus or run it on another machine")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="base URL of a running server (default: start one)")
+    parser.add_argument("--vus", type=int, default=50, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="op=weight list: search, list, tags, card, extract, create, update, delete")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a user's requests")
+    parser.add_argument("--contacts", type=int, default=5000, help="contacts for the first user; the others get 25-100%% of that")
+    parser.add_argument("--users", type=int, default=20, help="app users in the generated corpus")
+    parser.add_argument("--fake-latency-ms", type=float, default=50, help="latency of fake OpenAI/Supabase")
+    parser.add_argument("--stall-threshold-ms", type=float, default=100)
+    parser.add_argument("--slo-p95-ms", type=float, default=500)
+    parser.add_argument("--slo-error-rate", type=float, default=0.01)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--server-log", default="loadtest-server.log", help="where the started server's output goes")
+    args = parser.parse_args()
+
+    if args.target:
+        # Existing server: users are whoever the tokens name; cards may 404
+        user_ids = [f"loadtest-user-{n}" for n in range(args.users)]
+        slugs = [generate_business_card(uid, args.seed)["share_slug"] for uid in user_ids]
+        report = asyncio.run(run_load(args, args.target.rstrip("/"), user_ids, slugs))
+    else:
+        data_root = tempfile.mkdtemp(prefix="reachr-load-")
+        data_dir = os.path.join(data_root, "data")
+        print(f"Building corpus: {args.users} users x {args.contacts} contacts")
+        corpus = build_corpus(data_dir, args.contacts, args.users, args.seed, background_size=args.contacts)
+        # Half the slugs are served by fake Supabase, the rest fall back to the file scan
+        supabase_cards = {slug: {"full_name": "Loadtest", "share_slug": slug} for slug in corpus["slugs"][::2]}
+        server = None
+        log_file = open(args.server_log, "w")
+        try:
+            with run_fake_services(supabase_cards, args.fake_latency_ms / 1000) as (fake_url, _):
+                port = free_port()
+                server = start_server(port, {
+                    "DATA_DIR": data_dir,
+                    "OPENAI_API_KEY": "sk-loadtest",
+                    "OPENAI_BASE_URL": f"{fake_url}/v1",
+                    "SUPABASE_URL": fake_url,
+                    "SUPABASE_SECRET_KEY": "loadtest",
+                    "LOG_LEVEL": "WARNING",
+                    "LOOP_STALL_THRESHOLD_MS": str(args.stall_threshold_ms),
+                }, log_file)
+                base_url = f"http://127.0.0.1:{port}"
+                asyncio.run(wait_for_server(base_url))
+                report = asyncio.run(run_load(args, base_url, corpus["user_ids"], corpus["slugs"]))
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=10)
+            log_file.close()
+            shutil.rmtree(data_root, ignore_errors=True)
+
+    print_report(report, args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    if not all(s["slo_met"] for s in report["routes"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Cross-process write stress test.
+
+Starts --processes writer processes, each importing main.py against the
+same DATA_DIR and sending --writes POST /api/contacts plus one custom-tag
+add per write for one shared user through the ASGI app. A reader process
+loads the contacts continuously while they run. Afterwards it checks
+that no update was lost: every contact and tag is present, the change log
+seqs are 1..N without gaps or duplicates, and the reader never saw a
+partial or rolled-back state. Exits 1 on any violation.
+
+Run from backend/:
+    python benchmarks/stress_concurrent_writes.py --processes 8 --writes 50
+    python benchmarks/stress_concurrent_writes.py --unlocked   # shows lost updates without user_lock
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USER_ID = "stress-user"
+
+
+def configure_env(data_dir: str):
+    os.environ.update({
+        "DATA_DIR": data_dir,
+        "OPENAI_API_KEY": "sk-stress",
+        "LOG_LEVEL": "WARNING",
+    })
+    sys.path.insert(0, BACKEND_DIR)
+
+
+async def write_contacts(main, worker: int, writes: int):
+    import httpx
+    import jwt
+
+    headers = {"Authorization": "Bearer " + jwt.encode({"sub": USER_ID}, "stress")}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://stress", headers=headers, timeout=60) as client:
+        for i in range(writes):
+            response = await client.post("/api/contacts", json={"name": f"Worker {worker} Contact {i}"})
+            response.raise_for_status()
+            response = await client.post("/api/tags", json={"tag": f"w{worker}-t{i}"})
+            response.raise_for_status()
+
+
+def writer(data_dir: str, worker: int, writes: int, unlocked: bool, start):
+    configure_env(data_dir)
+    import main
+
+    if unlocked:
+        main.user_lock = lambda user_id: contextlib.nullcontext()
+    start.wait()
+    asyncio.run(write_contacts(main, worker, writes))
+
+
+def reader(data_dir: str, stop, result):
+    """Load the contacts in a loop; record reads, load errors and count regressions"""
+    configure_env(data_dir)
+    import main
+
+    reads = errors = regressions = 0
+    last_count = 0
+    while not stop.is_set():
+        try:
+            count = len(main.read_contacts(USER_ID))
+        except ValueError:
+            errors += 1
+            continue
+        reads += 1
+        if count < last_count:
+            regressions += 1
+        last_count = count
+    result.update(reads=reads, errors=errors, regressions=regressions)
+
+
+def check(data_dir: str, processes: int, writes: int) -> list:
+    configure_env(data_dir)
+    import main
+
+    problems = []
+    expected = processes * writes
+
+    contacts = main.read_contacts(USER_ID)
+    names = {c["name"] for c in contacts}
+    missing = [f"Worker {w} Contact {i}" for w in range(processes) for i in range(writes)
+               if f"Worker {w} Contact {i}" not in names]
+    if len(contacts) != expected or missing:
+        problems.append(f"contacts: {len(contacts)} stored, {expected} expected, {len(missing)} missing")
+
+    log = main.load_change_log(USER_ID)
+    seqs = [entry["seq"] for entry in log["changes"]]
+    if log["truncated_seq"] == 0 and seqs != list(range(1, expected + 1)):
+        problems.append(f"change log: {len(seqs)} entries, {len(set(seqs))} unique seqs, last seq {log['seq']}, "
+                        f"expected 1..{expected}")
+
+    with open(main.get_user_preferences_file(USER_ID)) as f:
+        tags = set(json.load(f).get("custom_tags", []))
+    lost_tags = expected - len(tags)
+    if lost_tags:
+        problems.append(f"custom tags: {lost_tags} of {expected} lost")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=50, help="contacts (and tags) written per process")
+    parser.add_argument("--unlocked", action="store_true", help="disable user_lock to show the race it prevents")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="reachr-stress-")
+    ctx = multiprocessing.get_context("spawn")
+    start, stop = ctx.Event(), ctx.Event()
+    try:
+        with ctx.Manager() as manager:
+            reader_result = manager.dict()
+            watcher = ctx.Process(target=reader, args=(data_dir, stop, reader_result))
+            writers = [
+                ctx.Process(target=writer, args=(data_dir, n, args.writes, args.unlocked, start))
+                for n in range(args.processes)
+            ]
+            watcher.start()
+            for proc in writers:
+                proc.start()
+
+            began = time.perf_counter()
+            start.set()
+            for proc in writers:
+                proc.join()
+            elapsed = time.perf_counter() - began
+            stop.set()
+            watcher.join()
+
+            failed = [proc.exitcode for proc in writers if proc.exitcode]
+            problems = [f"{len(failed)} writer process(es) failed"] if failed else []
+            problems += check(data_dir, args.processes, args.writes)
+            reads = dict(reader_result)
+
+        total = args.processes * args.writes * 2
+        print(f"{args.processes} processes x {args.writes} contacts + tags: {total} writes in {elapsed:.1f}s "
+              f"({total / elapsed:.0f}/s), lock {'OFF' if args.unlocked else 'on'}")
+        print(f"reader: {reads.get('reads', 0)} reads, {reads.get('errors', 0)} partial/invalid, "
+              f"{reads.get('regressions', 0)} count regressions")
+        if reads.get("errors") or reads.get("regressions"):
+            problems.append("reader saw partial or rolled-back files")
+        for problem in problems:
+            print("FAIL:", problem)
+        if problems:
+            sys.exit(1)
+        print("OK: no lost updates")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
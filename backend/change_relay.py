@@ -0,0 +1,55 @@
+"""Local relay for the change feed when running several API workers.
+
+Each worker started with CHANGE_BROKER_SOCKET=<path> connects here; every
+event line a worker sends is forwarded to all other workers, which deliver
+it to their own /api/changes/events subscribers. A worker that stops reading
+is disconnected once RELAY_MAX_BUFFER bytes are queued for it; it reconnects
+and its clients catch up through /api/contacts/changes.
+
+Usage:  python change_relay.py /tmp/reachr-changes.sock
+"""
+import asyncio
+import os
+import sys
+
+RELAY_MAX_BUFFER = int(os.getenv("RELAY_MAX_BUFFER", str(4 * 2 ** 20)))
+
+clients = set()
+
+
+async def handle_worker(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    clients.add(writer)
+    print(f"Worker connected ({len(clients)} total)")
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            for other in list(clients):
+                if other is writer:
+                    continue
+                if other.transport.get_write_buffer_size() > RELAY_MAX_BUFFER:
+                    print("Dropping slow worker")
+                    clients.discard(other)
+                    other.close()
+                    continue
+                other.write(line)
+    except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+        print(f"Worker connection error: {e}")
+    finally:
+        clients.discard(writer)
+        writer.close()
+        print(f"Worker disconnected ({len(clients)} total)")
+
+
+async def main(path: str):
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(handle_worker, path, limit=2 ** 20)
+    print(f"Change relay listening on {path}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else os.getenv("CHANGE_BROKER_SOCKET", "/tmp/reachr-changes.sock")))
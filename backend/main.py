@@ -1,21 +1,74 @@
 import os
+import re
+import sys
+import csv
 import json
 import uuid
+import time
+import asyncio
+import base64
+import bisect
+import hashlib
+import heapq
+import hmac
+import logging
+import random
+import threading
+import shutil
+import subprocess
+import tempfile
+import wave
+import zlib
 from datetime import datetime
+from collections import deque
+from contextlib import contextmanager
 from typing import Optional, List
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Header
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from dotenv import load_dotenv
-import pytesseract
-from PIL import Image
 import io
-import openai
-import jwt
-import httpx
 
 load_dotenv()
 
+# Structured logging
+#
+# One JSON object per line (LOG_FORMAT=text for plain lines during local
+# development). Extra fields are passed as log_event(level, message, key=value).
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+
+class JsonLogFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+logger = logging.getLogger("reachr")
+logger.setLevel(LOG_LEVEL)
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(
+    JsonLogFormatter() if LOG_FORMAT == "json"
+    else logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+)
+logger.addHandler(_log_handler)
+logger.propagate = False
+
+
+def log_event(level: int, message: str, **fields):
+    """Log message with structured fields (level is a logging constant)"""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={"fields": fields})
+
 # Supabase REST API configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://dsljfcswyktyatennjev.supabase.co")
 SUPABASE_KEY = os.getenv("SUPABASE_SECRET_KEY", os.getenv("SUPABASE_ANON_KEY", ""))
@@ -31,13 +84,504 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Data directory - use 'data' subdirectory relative to this file
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+# Response serialization and compression
+#
+# FastJSONResponse serializes already JSON-native payloads (contacts loaded
+# from our own files) directly with orjson, skipping jsonable_encoder.
+# CompressionMiddleware negotiates brotli or gzip for bodies above
+# COMPRESSION_MIN_BYTES; streamed bodies are flushed per chunk so NDJSON
+# progress and exports still arrive incrementally.
+try:
+    import orjson
+except ImportError:  # optional - falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional - gzip only
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_SKIP_TYPES = ("text/event-stream", "image/", "audio/", "video/")
+
+
+def json_default(obj):
+    """Render cached contact records (see CompactContact) as their stored dicts"""
+    if isinstance(obj, CompactContact):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, ensure_ascii=False, separators=(",", ":"), default=json_default
+        ).encode("utf-8")
+
+
+def choose_content_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_content_encoding(accept)
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        def compress(data: bytes, final: bool) -> bytes:
+            if encoding == "br":
+                out = compressor.process(data)
+                return out + (compressor.finish() if final else compressor.flush())
+            out = compressor.compress(data)
+            return out + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+        def new_compressor():
+            if encoding == "br":
+                return brotli.Compressor(quality=4)
+            return zlib.compressobj(6, zlib.DEFLATED, 31)
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if (
+                    b"content-encoding" in headers
+                    or message["status"] in (204, 304)
+                    or content_type.startswith(COMPRESSION_SKIP_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Hold the start message until we know the body size
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = new_compressor()
+                headers = [
+                    (k, v) for k, v in start_message.get("headers", [])
+                    if k.lower() != b"content-length"
+                ]
+                headers.append((b"content-encoding", encoding.encode()))
+                headers.append((b"vary", b"Accept-Encoding"))
+                compressed = compress(body, final=not more_body)
+                if not more_body:
+                    headers.append((b"content-length", str(len(compressed)).encode()))
+                await send({**start_message, "headers": headers})
+                await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+                return
+
+            await send({
+                "type": "http.response.body",
+                "body": compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_wrapper)
+
+
+app.add_middleware(CompressionMiddleware)
+
+# Metrics
+#
+# Minimal Prometheus-style counters and histograms, exposed in the text
+# exposition format at GET /metrics. Updates take one lock and a bisect, so
+# they are cheap enough to leave on in production; label values must come
+# from small fixed sets (route templates, not raw paths).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+COUNT_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+
+metrics_registry = []
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [
+        f'{n}="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for n, v in zip(names, values)
+    ]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.values = {}
+        self._lock = threading.Lock()
+        metrics_registry.append(self)
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self.values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.values = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+        metrics_registry.append(self)
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(counts)) for labels, counts in self.values.items()]
+        for labels, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {counts[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class GaugeCallback:
+    """Gauge whose samples are read from fn() -> [(label values, value)] at scrape time"""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple, fn):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.fn = fn
+        metrics_registry.append(self)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.fn():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in metrics_registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency, including streamed bodies", ("method", "route"))
+JSON_IO_SECONDS = Histogram("json_io_duration_seconds", "Time to read or write a JSON data file", ("op", "file"))
+JSON_IO_BYTES = Histogram("json_io_bytes", "Size of JSON data files read or written", ("op", "file"), SIZE_BUCKETS)
+SEARCH_SECONDS = Histogram("search_duration_seconds", "search_contacts duration")
+SEARCH_CANDIDATES = Histogram("search_candidates", "Contacts scanned per search", (), COUNT_BUCKETS)
+OPENAI_LATENCY = Histogram("openai_request_duration_seconds", "OpenAI call latency", ("operation", "model", "outcome"))
+TESSERACT_SECONDS = Histogram("tesseract_duration_seconds", "Tesseract OCR duration")
+SUPABASE_LATENCY = Histogram("supabase_request_duration_seconds", "Supabase REST round-trip latency", ("operation", "status"))
+EVENT_LOOP_LAG = Histogram("event_loop_lag_seconds", "Delay of the event loop monitor's wakeups")
+EVENT_LOOP_STALLS = Counter("event_loop_stalls_total", "Event loop lags above LOOP_STALL_THRESHOLD_MS")
+CONTACT_JOURNAL_COMPACTIONS = Counter("contact_journal_compactions_total", "Contacts journals folded into a new snapshot")
+CONTACT_CACHE_REQUESTS = Counter("contact_cache_requests_total", "Contact cache lookups by result", ("result",))
+CONTACT_WRITE_BATCH = Histogram(
+    "contact_write_batch_size", "Contact mutations committed per contacts file write", (), (1, 2, 5, 10, 50, 100, 500)
+)
+
+
+class UploadLimitMiddleware:
+    """Reject uploads whose Content-Length exceeds the route's cap (UPLOAD_MAX_BYTES)
+
+    The multipart body is parsed and spooled before a handler runs, so this
+    is the only place an oversized upload can be refused before it is read.
+    Bodies without a Content-Length are still capped by spool_upload.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST":
+            max_bytes = UPLOAD_MAX_BYTES.get(scope["path"])
+            length = dict(scope["headers"]).get(b"content-length", b"")
+            if max_bytes is not None and length.isdigit() and int(length) > max_bytes + UPLOAD_FORM_OVERHEAD:
+                from fastapi.responses import JSONResponse
+
+                response = JSONResponse(
+                    {"detail": f"File too large (max {max_bytes // (1024 * 1024)} MB)"}, status_code=413
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(UploadLimitMiddleware)
+
+
+class MetricsMiddleware:
+    """Record per-route latency and status for every HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; unmatched
+            # paths share one label so cardinality stays bounded
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            HTTP_LATENCY.observe(time.perf_counter() - start, scope["method"], route_path)
+            HTTP_REQUESTS.inc(scope["method"], route_path, str(status))
+
+
+app.add_middleware(MetricsMiddleware)
+
+# Data directory - use 'data' subdirectory relative to this file (DATA_DIR overrides)
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(__file__), "data"))
 
 # Supabase JWT secret (get from Supabase dashboard > Settings > API > JWT Secret)
 SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "")
 
 
+# Request profiling
+#
+# Opt-in per request: send X-Profile with PROFILE_ADMIN_TOKEN, or set
+# PROFILE_SAMPLE_RATE to profile a random fraction of requests. A sampling
+# thread records the stacks of all threads every PROFILE_INTERVAL_MS while
+# the request runs (so concurrent requests can show up too) and stores them
+# in collapsed-stack format for flamegraph.pl / speedscope. Stacks without
+# app or framework frames (idle loop and pool threads) are skipped. The last
+# PROFILE_MAX_FILES profiles are kept in data/profiles. When neither setting
+# is on, the middleware isn't installed at all.
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILES_DIR = os.path.join(DATA_DIR, "profiles")
+PROFILE_ID_RE = re.compile(r"^\d{13}-[0-9a-f]{8}$")
+PROFILE_APP_FILE = os.path.abspath(__file__)
+PROFILE_FRAMEWORK_MARKERS = (os.sep + "fastapi" + os.sep, os.sep + "starlette" + os.sep)
+
+
+class StackSampler:
+    """Count collapsed stacks of all other threads at a fixed interval"""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        thread_names = {}
+        while not self._stop.wait(self.interval_seconds):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                frames = []
+                relevant = False
+                while frame is not None:
+                    code = frame.f_code
+                    if not relevant and (
+                        code.co_filename == PROFILE_APP_FILE
+                        or any(m in code.co_filename for m in PROFILE_FRAMEWORK_MARKERS)
+                    ):
+                        relevant = True
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if not relevant:
+                    continue
+                if ident not in thread_names:
+                    thread_names = {t.ident: t.name for t in threading.enumerate()}
+                frames.append(thread_names.get(ident, str(ident)))
+                key = ";".join(reversed(frames))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+def save_profile(meta: dict, collapsed: str):
+    """Write a profile and its metadata, then drop the oldest beyond PROFILE_MAX_FILES"""
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    base = os.path.join(PROFILES_DIR, meta["id"])
+    with open(base + ".folded", "w") as f:
+        f.write(collapsed)
+    with open(base + ".json", "w") as f:
+        json.dump(meta, f, indent=2)
+
+    ids = sorted(name[:-5] for name in os.listdir(PROFILES_DIR) if name.endswith(".json"))
+    for old_id in ids[:-PROFILE_MAX_FILES] if len(ids) > PROFILE_MAX_FILES else []:
+        for ext in (".json", ".folded"):
+            try:
+                os.remove(os.path.join(PROFILES_DIR, old_id + ext))
+            except FileNotFoundError:
+                pass
+
+
+class ProfilingMiddleware:
+    """Profile requests carrying the admin X-Profile header, or a sampled fraction"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def should_profile(self, scope) -> Optional[str]:
+        if PROFILE_ADMIN_TOKEN:
+            for name, value in scope.get("headers", []):
+                if name == b"x-profile":
+                    if hmac.compare_digest(value.decode("latin-1"), PROFILE_ADMIN_TOKEN):
+                        return "header"
+                    break
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self.should_profile(scope) if scope["type"] == "http" else None
+        if not trigger:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        sampler = StackSampler(PROFILE_INTERVAL_MS / 1000)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            route = scope.get("route")
+            meta = {
+                "id": profile_id,
+                "created_at": datetime.now().isoformat(),
+                "trigger": trigger,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                "samples": sampler.samples,
+                "interval_ms": PROFILE_INTERVAL_MS,
+            }
+            try:
+                await asyncio.to_thread(save_profile, meta, sampler.collapsed())
+            except OSError as e:
+                log_event(logging.ERROR, "Error saving profile", profile_id=profile_id, error=str(e))
+
+
+if PROFILE_ADMIN_TOKEN or PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(ProfilingMiddleware)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Dependency for admin endpoints; they're disabled unless PROFILE_ADMIN_TOKEN is set"""
+    if not PROFILE_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, PROFILE_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
 def get_user_id_from_token(authorization: Optional[str] = Header(None)) -> Optional[str]:
     """Extract user_id from Supabase JWT token"""
     if not authorization:
@@ -47,6 +591,8 @@ def get_user_id_from_token(authorization: Optional[str] = Header(None)) -> Optio
         # Remove 'Bearer ' prefix
         token = authorization.replace("Bearer ", "")
 
+        import jwt
+
         # Decode JWT (without verification if no secret, with verification if secret exists)
         if SUPABASE_JWT_SECRET:
             decoded = jwt.decode(token, SUPABASE_JWT_SECRET, algorithms=["HS256"], audience="authenticated")
@@ -56,25 +602,313 @@ def get_user_id_from_token(authorization: Optional[str] = Header(None)) -> Optio
 
         return decoded.get("sub")  # 'sub' contains the user ID
     except Exception as e:
-        print(f"Error decoding JWT: {e}")
+        log_event(logging.WARNING, "Error decoding JWT", error=str(e))
+        return None
+
+
+# User directory layout
+#
+# Each user's files live in users/<ab>/<cd>/<user_id>/, where ab and cd come
+# from a hash of the id, so no directory holds more than a few hundred
+# entries at 100k+ users. Directories are created on first write only
+# (ensure_dir), and paths known to exist are remembered so later requests
+# skip the stat. Users still in the old flat users/<user_id>/ layout are
+# served from there until migrate_user_dirs.py moves them. Known paths are
+# cached per process, so don't delete user directories under running workers.
+# Flat-layout paths are cached too, but only while users/ keeps the mtime
+# it had when they were looked up: moving a user out of it (in any process)
+# changes that mtime, so a cached flat path costs one stat of users/.
+KNOWN_DIRS_MAX = int(os.getenv("KNOWN_DIRS_MAX", "200000"))
+known_dirs = set()
+known_user_dirs = {}  # user_id -> sharded directory known to exist
+known_legacy_dirs = {}  # user_id -> flat-layout directory, valid for legacy_dirs_stamp
+legacy_dirs_stamp = None
+
+
+def ensure_dir(path: str) -> str:
+    """Create path if this process hasn't seen it exist yet"""
+    if path not in known_dirs:
+        os.makedirs(path, exist_ok=True)
+        if len(known_dirs) >= KNOWN_DIRS_MAX:
+            known_dirs.clear()
+        known_dirs.add(path)
+    return path
+
+
+def sharded_user_dir(user_id: str) -> str:
+    digest = hashlib.sha1(user_id.encode()).hexdigest()
+    return os.path.join(DATA_DIR, "users", digest[:2], digest[2:4], user_id)
+
+
+def legacy_user_dir(user_id: str) -> str:
+    return os.path.join(DATA_DIR, "users", user_id)
+
+
+def get_user_dir(user_id: Optional[str]) -> str:
+    """Directory for a user's files (DATA_DIR for anonymous data); it may not exist yet"""
+    if not user_id:
+        return DATA_DIR
+    global legacy_dirs_stamp
+    path = known_user_dirs.get(user_id)
+    if path:
+        return path
+    # Stamp before looking, so a move after this point invalidates the entry
+    stamp = users_dir_stamp()
+    if stamp != legacy_dirs_stamp:
+        known_legacy_dirs.clear()
+        legacy_dirs_stamp = stamp
+    legacy = known_legacy_dirs.get(user_id)
+    if legacy:
+        return legacy
+
+    path = sharded_user_dir(user_id)
+    if path in known_dirs or os.path.isdir(path):
+        if len(known_user_dirs) >= KNOWN_DIRS_MAX:
+            known_user_dirs.clear()
+        known_user_dirs[user_id] = ensure_dir(path)
+        return path
+    legacy = legacy_user_dir(user_id)
+    if not os.path.isdir(legacy):
+        return path
+    if len(known_legacy_dirs) >= KNOWN_DIRS_MAX:
+        known_legacy_dirs.clear()
+    known_legacy_dirs[user_id] = legacy
+    return legacy
+
+
+def users_dir_stamp() -> Optional[int]:
+    try:
+        return os.stat(os.path.join(DATA_DIR, "users")).st_mtime_ns
+    except FileNotFoundError:
         return None
 
 
+def is_shard_dir(name: str) -> bool:
+    return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+
+def iter_user_dirs():
+    """Yield (user_id, directory) for every user, in both the sharded and the flat layout"""
+    users_dir = os.path.join(DATA_DIR, "users")
+    if not os.path.isdir(users_dir):
+        return
+    for name in os.listdir(users_dir):
+        path = os.path.join(users_dir, name)
+        if not is_shard_dir(name):
+            yield name, path
+            continue
+        for sub in os.listdir(path):
+            sub_path = os.path.join(path, sub)
+            for user_id in os.listdir(sub_path):
+                yield user_id, os.path.join(sub_path, user_id)
+
+
 def get_user_data_file(user_id: Optional[str]) -> str:
     """Get the data file path for a specific user"""
-    if user_id:
-        # Per-user contacts file
-        user_dir = os.path.join(DATA_DIR, "users", user_id)
-        os.makedirs(user_dir, exist_ok=True)
-        return os.path.join(user_dir, "contacts.json")
-    else:
-        # Anonymous/shared contacts (legacy)
-        return os.path.join(DATA_DIR, "contacts.json")
+    # Anonymous/shared contacts (legacy) live directly in DATA_DIR
+    return os.path.join(get_user_dir(user_id), "contacts.json")
 
 # OpenAI client
+#
+# Importing openai (and the httpx stack under it) takes about half a second,
+# so the module is imported and the client built on first use, or earlier by
+# the dependency warm-up task. PIL, pytesseract, httpx and jwt are likewise
+# imported inside the functions that use them.
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 openai_client = None
-if os.getenv("OPENAI_API_KEY"):
-    openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+openai_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    """The shared OpenAI client, created on first use (None without an API key)"""
+    global openai_client
+    if openai_client is None and OPENAI_API_KEY:
+        with openai_client_lock:
+            if openai_client is None:
+                import openai
+
+                openai_client = openai.OpenAI(
+                    api_key=OPENAI_API_KEY,
+                    timeout=float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60")),
+                )
+    return openai_client
+
+
+# Circuit breakers for external calls
+#
+# Each breaker tracks the error and slow-call rate of its calls over a rolling
+# window. When either rate crosses its threshold the breaker opens and calls
+# are rejected immediately (callers use their local fallback) until the
+# cooldown passes; then a few half-open probe calls decide whether it closes.
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit breaker is open"""
+
+
+def is_breaker_failure(error: Exception) -> bool:
+    """Client errors (bad input) don't mean the service is degraded"""
+    import openai
+
+    return not isinstance(error, (openai.BadRequestError, openai.UnprocessableEntityError))
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether a failed call is worth retrying later: the service was down or slow, the input wasn't bad"""
+    import openai
+
+    if isinstance(error, HTTPException):
+        return error.status_code in (429, 502, 503, 504)
+    return isinstance(error, (
+        CircuitOpenError, TimeoutError, ConnectionError,
+        openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError,
+    ))
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        slow_call_seconds: float,
+        window_seconds: float = float(os.getenv("BREAKER_WINDOW_SECONDS", "60")),
+        min_calls: int = int(os.getenv("BREAKER_MIN_CALLS", "5")),
+        error_rate_threshold: float = float(os.getenv("BREAKER_ERROR_RATE", "0.5")),
+        slow_rate_threshold: float = float(os.getenv("BREAKER_SLOW_RATE", "0.5")),
+        open_seconds: float = float(os.getenv("BREAKER_OPEN_SECONDS", "30")),
+        half_open_probes: int = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "2")),
+    ):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.transitions = {}
+        self.counters = {"success": 0, "failure": 0, "slow": 0, "rejected": 0}
+        self._lock = threading.Lock()
+        self._calls = deque()  # (finished_at, failed, slow)
+        self._window_failures = 0
+        self._window_slow = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _transition(self, new_state: str):
+        key = f"{self.state}->{new_state}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        log_event(logging.WARNING, "Circuit breaker transition", breaker=self.name, transition=key)
+        self.state = new_state
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if new_state == "open":
+            self.opened_at = time.monotonic()
+        self._calls.clear()
+        self._window_failures = 0
+        self._window_slow = 0
+
+    def _prune(self, now: float):
+        while self._calls and self._calls[0][0] < now - self.window_seconds:
+            _, failed, slow = self._calls.popleft()
+            self._window_failures -= failed
+            self._window_slow -= slow
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.counters["rejected"] += 1
+                    return False
+                self._transition("half_open")
+            if self.state == "half_open":
+                if self._probes_in_flight >= self.half_open_probes:
+                    self.counters["rejected"] += 1
+                    return False
+                self._probes_in_flight += 1
+            return True
+
+    def record(self, failed: bool, latency: float):
+        with self._lock:
+            slow = latency >= self.slow_call_seconds
+            self.counters["failure" if failed else "success"] += 1
+            if slow:
+                self.counters["slow"] += 1
+
+            if self.state == "half_open":
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed or slow:
+                    self._transition("open")
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._transition("closed")
+                return
+            if self.state == "open":
+                # A call admitted before the breaker opened finished late
+                return
+
+            now = time.monotonic()
+            self._calls.append((now, failed, slow))
+            self._window_failures += failed
+            self._window_slow += slow
+            self._prune(now)
+
+            calls = len(self._calls)
+            if calls >= self.min_calls and (
+                self._window_failures / calls >= self.error_rate_threshold
+                or self._window_slow / calls >= self.slow_rate_threshold
+            ):
+                self._transition("open")
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn through the breaker, raising CircuitOpenError if it's open"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record(is_breaker_failure(e), time.monotonic() - start)
+            raise
+        self.record(False, time.monotonic() - start)
+        return result
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._prune(time.monotonic())
+            calls = len(self._calls)
+            return {
+                "state": self.state,
+                "window_calls": calls,
+                "window_error_rate": round(self._window_failures / calls, 4) if calls else 0.0,
+                "window_slow_rate": round(self._window_slow / calls, 4) if calls else 0.0,
+                "slow_call_seconds": self.slow_call_seconds,
+                "counters": dict(self.counters),
+                "transitions": dict(self.transitions),
+            }
+
+
+openai_breakers = {
+    "vision": CircuitBreaker("openai_vision", slow_call_seconds=20),
+    "chat": CircuitBreaker("openai_chat", slow_call_seconds=20),
+    "transcription": CircuitBreaker("openai_transcription", slow_call_seconds=45),
+}
+
+
+def call_openai(operation: str, fn, **kwargs):
+    """Call an OpenAI client method through its breaker, recording latency per model"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        result = openai_breakers[operation].call(fn, **kwargs)
+        outcome = "ok"
+        return result
+    except CircuitOpenError:
+        outcome = "rejected"
+        raise
+    finally:
+        OPENAI_LATENCY.observe(time.perf_counter() - start, operation, kwargs.get("model", ""), outcome)
 
 
 # Models
@@ -113,6 +947,38 @@ class ContactCreate(BaseModel):
     priority: Optional[int] = 50
 
 
+class ContactUpdate(BaseModel):
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    company: Optional[str] = None
+    role: Optional[str] = None
+    industry: Optional[str] = None
+    location: Optional[str] = None
+    linkedin_url: Optional[str] = None
+    tags: Optional[List[str]] = None
+    raw_context: Optional[str] = None
+    met_date: Optional[str] = None
+    meeting_location: Optional[str] = None
+    priority: Optional[int] = None
+
+
+class BatchOperation(BaseModel):
+    op: str  # "create", "update" or "delete"
+    id: Optional[str] = None
+    contact: Optional[dict] = None
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+    atomic: bool = True
+
+
+class MergeRequest(BaseModel):
+    contact_ids: List[str]
+    primary_id: Optional[str] = None
+
+
 class SearchRequest(BaseModel):
     query: str
 
@@ -330,33 +1196,836 @@ INDUSTRY_DEFAULT_TAGS = {
 }
 
 
+# Cross-process locking
+#
+# Several uvicorn/gunicorn workers may serve the same user, so every
+# read-modify-write of a user's files runs under user_lock(user_id): an
+# exclusive flock on the user's .lock file. It is re-entrant per thread
+# (save_contacts takes it again inside an endpoint's lock). Acquiring it
+# blocks while another worker or thread holds it, so async endpoints run
+# their locked section in asyncio.to_thread rather than on the event loop,
+# and nothing awaits while holding it.
+try:
+    import fcntl
+except ImportError:  # Windows - falls back to in-process locks only
+    fcntl = None
+
+_lock_state = threading.local()
+_thread_locks = {}  # user_id -> threading.RLock, used when fcntl is unavailable
+_thread_locks_guard = threading.Lock()
+
+
+def get_user_lock_file(user_id: Optional[str]) -> str:
+    if user_id:
+        return os.path.join(ensure_dir(get_user_dir(user_id)), ".lock")
+    return os.path.join(ensure_dir(DATA_DIR), "contacts.lock")
+
+
+def open_user_lock(user_id: Optional[str]) -> int:
+    """Open and flock the user's lock file; the fd to close when done
+
+    The user's directory may be moved to the sharded layout while we wait,
+    so the lock only counts if the file is still the one at the user's
+    current path once it is ours.
+    """
+    while True:
+        path = get_user_lock_file(user_id)
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        except FileNotFoundError:
+            # Directory moved between resolving and opening (or removed)
+            known_dirs.discard(os.path.dirname(path))
+            known_user_dirs.pop(user_id, None)
+            known_legacy_dirs.pop(user_id, None)
+            continue
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_ino == os.stat(get_user_lock_file(user_id)).st_ino:
+                return fd
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+
+
+@contextmanager
+def user_lock(user_id: Optional[str]):
+    """Hold the user's exclusive cross-process write lock"""
+    held = getattr(_lock_state, "held", None)
+    if held is None:
+        held = _lock_state.held = {}
+    if user_id in held:
+        held[user_id] += 1
+        try:
+            yield
+        finally:
+            held[user_id] -= 1
+        return
+
+    if fcntl is None:
+        with _thread_locks_guard:
+            lock = _thread_locks.setdefault(user_id, threading.RLock())
+        with lock:
+            held[user_id] = 1
+            try:
+                yield
+            finally:
+                del held[user_id]
+        return
+
+    fd = open_user_lock(user_id)
+    try:
+        held[user_id] = 1
+        try:
+            yield
+        finally:
+            del held[user_id]
+    finally:
+        # Closing the descriptor releases the flock
+        os.close(fd)
+
+
+def migrate_user_dir(user_id: str) -> bool:
+    """Move a user's directory from the flat to the sharded layout; False if there was nothing to move
+
+    One rename under the user's lock, so it is safe while workers serve the
+    user: they re-resolve the path once they get the lock.
+    """
+    legacy = legacy_user_dir(user_id)
+    target = sharded_user_dir(user_id)
+    with user_lock(user_id):
+        if not os.path.isdir(legacy):
+            return False
+        if os.path.isdir(target):
+            # A worker that resolved the old path just before an earlier move
+            # can leave an empty directory (or just its lock file) behind
+            if set(os.listdir(legacy)) - {".lock"}:
+                raise FileExistsError(f"{user_id} has data in both {legacy} and {target}")
+            shutil.rmtree(legacy)
+            return False
+        ensure_dir(os.path.dirname(target))
+        os.rename(legacy, target)
+        known_legacy_dirs.pop(user_id, None)
+    known_dirs.discard(legacy)
+    ensure_dir(target)
+    return True
+
+
+def try_lock_file(path: str) -> Optional[int]:
+    """Take a non-blocking exclusive flock on path; the fd to close, or None if held elsewhere"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    if fcntl is None:
+        return fd
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
 # Helper functions
+def read_json_file(path: str, kind: str):
+    """Load a JSON data file, recording its size and load time under kind"""
+    start = time.perf_counter()
+    with open(path, "r") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    JSON_IO_SECONDS.observe(time.perf_counter() - start, "load", kind)
+    JSON_IO_BYTES.observe(len(raw), "load", kind)
+    return data
+
+
+def write_json_file(path: str, data, kind: str):
+    """Atomically replace a JSON data file, recording its size and save time under kind
+
+    The data goes to a temp file in the same directory, is fsynced and then
+    renamed over path, so readers in any process see either the old or the
+    new file, never a partial one. The directory is created if missing.
+    """
+    start = time.perf_counter()
+    raw = json.dumps(data, indent=2)
+    fd, temp_path = tempfile.mkstemp(dir=ensure_dir(os.path.dirname(path)), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    JSON_IO_SECONDS.observe(time.perf_counter() - start, "save", kind)
+    JSON_IO_BYTES.observe(len(raw), "save", kind)
+
+
+# Contact storage
+#
+# A user's contacts are a snapshot, contacts.json ({"seq": N, "contacts":
+# [...]}), plus an append-only journal, contacts.journal. With
+# CONTACT_STORAGE=journal (default) a save appends one line per change,
+# holding the change-log entry and, for inserts and updates, the full
+# contact. A write costs bytes proportional to the contacts it touches, not
+# to the address book. Journal lines double as the newest part of the
+# change log.
+#
+# Readers read the journal before the snapshot and replay only records with
+# a seq above the snapshot's, so a compaction in between is harmless. A
+# final line without its newline (torn by a crash, or an append still in
+# progress) is ignored, and the next append cuts it off. Once the journal
+# outgrows CONTACT_JOURNAL_COMPACT_RATIO of the snapshot, a background
+# thread folds it into a new snapshot and change log.
+# CONTACT_STORAGE=snapshot rewrites the snapshot on every save.
+CONTACT_STORAGE = os.getenv("CONTACT_STORAGE", "journal")
+CONTACT_JOURNAL_COMPACT_RATIO = float(os.getenv("CONTACT_JOURNAL_COMPACT_RATIO", "0.5"))
+CONTACT_JOURNAL_COMPACT_MIN_BYTES = int(os.getenv("CONTACT_JOURNAL_COMPACT_MIN_BYTES", str(256 * 1024)))
+
+
+def get_contacts_journal_file(user_id: Optional[str]) -> str:
+    """Get the contacts journal path for a specific user"""
+    data_file = get_user_data_file(user_id)
+    return os.path.join(os.path.dirname(data_file), "contacts.journal")
+
+
+def read_snapshot_header(user_id: Optional[str]) -> tuple:
+    """(seq, size) of a user's contacts snapshot
+
+    seq is None if there is no snapshot or it predates the journal (no
+    leading "seq" key); only the first bytes of the file are read.
+    """
+    try:
+        with open(get_user_data_file(user_id), "r") as f:
+            head = f.read(256)
+            size = os.fstat(f.fileno()).st_size
+    except FileNotFoundError:
+        return None, 0
+    match = re.match(r'\s*\{\s*"seq"\s*:\s*(\d+)', head)
+    return (int(match.group(1)) if match else None), size
+
+
+def read_contacts_journal(user_id: Optional[str]) -> List[dict]:
+    """Complete journal records in order; a torn final record is left out"""
+    start = time.perf_counter()
+    try:
+        with open(get_contacts_journal_file(user_id), "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return []
+    records = []
+    # The last element is b"" after a complete final line, else a torn record
+    for line in raw.split(b"\n")[:-1]:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            log_event(logging.ERROR, "Skipping corrupt contacts journal record", user_id=user_id)
+    JSON_IO_SECONDS.observe(time.perf_counter() - start, "load", "journal")
+    JSON_IO_BYTES.observe(len(raw), "load", "journal")
+    return records
+
+
+def replay_contacts_journal(contacts: List[dict], records: List[dict], after_seq: int) -> List[dict]:
+    """Apply journal records newer than after_seq to a snapshot's contact list"""
+    positions = {}
+    for i, contact in enumerate(contacts):
+        contact_id = contact.get("id")
+        if contact_id is not None and contact_id not in positions:
+            positions[contact_id] = i
+    for record in records:
+        if record["seq"] <= after_seq:
+            continue
+        index = positions.get(record["id"])
+        if record["op"] == "delete":
+            if index is not None:
+                contacts[index] = None
+                del positions[record["id"]]
+        elif "c" not in record:
+            # Written without its contact because a later record deletes it
+            continue
+        elif index is None:
+            positions[record["id"]] = len(contacts)
+            contacts.append(record["c"])
+        else:
+            contacts[index] = record["c"]
+    return [c for c in contacts if c is not None]
+
+
+def read_contacts(user_id: Optional[str] = None) -> List[dict]:
+    """Load a user's contacts (snapshot plus newer journal records), raising on errors"""
+    records = read_contacts_journal(user_id)
+    data_file = get_user_data_file(user_id)
+    snapshot = read_json_file(data_file, "contacts") if os.path.exists(data_file) else {}
+    contacts = snapshot.get("contacts", [])
+    if records:
+        contacts = replay_contacts_journal(contacts, records, snapshot.get("seq", 0))
+    return contacts
+
+
 def load_contacts(user_id: Optional[str] = None) -> List[dict]:
     """Load contacts from JSON file for a specific user"""
-    data_file = get_user_data_file(user_id)
     try:
-        if os.path.exists(data_file):
-            with open(data_file, "r") as f:
-                data = json.load(f)
-                return data.get("contacts", [])
+        return read_contacts(user_id)
     except Exception as e:
-        print(f"Error loading contacts for user {user_id}: {e}")
+        log_event(logging.ERROR, "Error loading contacts", user_id=user_id, error=str(e))
     return []
 
 
-def save_contacts(contacts: List[dict], user_id: Optional[str] = None):
-    """Save contacts to JSON file for a specific user"""
+def journal_overlay(records: List[dict], after_seq: int) -> tuple:
+    """What journal records newer than after_seq do to each contact id
+
+    Returns (latest, detached, appended): latest maps an id to its newest
+    contact, or None once deleted; ids in detached were deleted, so their
+    snapshot copy is dropped; appended lists ids in the order
+    replay_contacts_journal would append them if they aren't in the snapshot.
+    """
+    latest, detached, appended = {}, set(), {}
+    for record in records:
+        if record["seq"] <= after_seq:
+            continue
+        contact_id = record["id"]
+        if record["op"] == "delete":
+            latest[contact_id] = None
+            detached.add(contact_id)
+            appended.pop(contact_id, None)
+        elif "c" in record:
+            latest[contact_id] = record["c"]
+            appended.setdefault(contact_id, None)
+    return latest, detached, list(appended)
+
+
+def iter_contacts(user_id: Optional[str] = None, chunk_size: int = 64 * 1024):
+    """Yield a user's contacts one at a time without loading the whole file
+
+    Parses the {"contacts": [...]} snapshot incrementally, so memory stays
+    proportional to one contact rather than the whole address book. Journal
+    records newer than the snapshot are applied by id as the snapshot
+    streams past, and contacts the journal adds come last, in the same order
+    read_contacts gives.
+    """
+    records = read_contacts_journal(user_id)
+    data_file = get_user_data_file(user_id)
+    if not os.path.exists(data_file):
+        yield from replay_contacts_journal([], records, 0)
+        return
+
+    decoder = json.JSONDecoder()
+    with open(data_file, "r") as f:
+        buf = f.read(chunk_size)
+        start = re.search(r'"contacts"\s*:\s*\[', buf)
+        while not start:
+            more = f.read(chunk_size)
+            if not more:
+                return
+            buf += more
+            start = re.search(r'"contacts"\s*:\s*\[', buf)
+        pos = start.end()
+
+        seq = re.search(r'"seq"\s*:\s*(\d+)', buf[:start.start()])
+        latest, detached, appended = journal_overlay(records, int(seq.group(1)) if seq else 0)
+        seen = set()
+
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                break
+            try:
+                contact, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # The next contact isn't fully buffered yet
+                more = f.read(chunk_size)
+                if not more:
+                    log_event(logging.WARNING, "Truncated contacts file", user_id=user_id)
+                    break
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            pos = end
+            if pos > chunk_size:
+                buf = buf[pos:]
+                pos = 0
+
+            # Like replay_contacts_journal, only an id's first snapshot copy is replaced
+            contact_id = contact.get("id")
+            if latest and contact_id in latest and contact_id not in seen:
+                seen.add(contact_id)
+                if contact_id in detached:
+                    continue
+                contact = latest[contact_id]
+            yield contact
+
+    for contact_id in appended:
+        if latest[contact_id] is not None and (contact_id in detached or contact_id not in seen):
+            yield latest[contact_id]
+
+
+def journal_line_start(f, end: int, chunk_size: int = 64 * 1024) -> int:
+    """Offset where the line ending at end begins, scanning backwards"""
+    pos = end
+    while pos > 0:
+        read_from = max(0, pos - chunk_size)
+        f.seek(read_from)
+        index = f.read(pos - read_from).rfind(b"\n")
+        if index >= 0:
+            return read_from + index + 1
+        pos = read_from
+    return 0
+
+
+def repair_contacts_journal(f, user_id: Optional[str]) -> Optional[dict]:
+    """Cut torn or corrupt records off the end of an open journal; return the last good one
+
+    Only reads the tail of the file. Call with the user's lock held.
+    """
+    size = f.seek(0, os.SEEK_END)
+    end = size
+    last = None
+    while end > 0:
+        f.seek(end - 1)
+        complete = f.read(1) == b"\n"
+        line_end = end - 1 if complete else end
+        start = journal_line_start(f, line_end)
+        if complete:
+            f.seek(start)
+            try:
+                last = json.loads(f.read(line_end - start))
+                break
+            except ValueError:
+                pass
+        end = start
+    if end < size:
+        log_event(logging.WARNING, "Truncating torn contacts journal record", user_id=user_id, bytes=size - end)
+        f.truncate(end)
+    return last
+
+
+def append_contacts_journal(user_id: Optional[str], contacts: List[dict], changes: Optional[List[tuple]]):
+    """Append changes and the contacts they touch to the journal and return the change entries
+
+    Returns None without writing if the changes can't be journaled (no
+    changes, no snapshot with a seq yet, or a changed contact missing from
+    contacts); the caller then writes a full snapshot.
+    """
+    if not changes or any(contact_id is None for _, contact_id in changes):
+        return None
+    snapshot_seq, snapshot_size = read_snapshot_header(user_id)
+    if snapshot_seq is None:
+        return None
+
+    wanted = {contact_id for op, contact_id in changes if op != "delete"}
+    found = {c["id"]: c for c in contacts if c.get("id") in wanted} if wanted else {}
+    deleted_later = set()
+    for op, contact_id in reversed(changes):
+        if op == "delete":
+            deleted_later.add(contact_id)
+        elif contact_id not in found and contact_id not in deleted_later:
+            return None
+
+    start = time.perf_counter()
+    with open(get_contacts_journal_file(user_id), "ab+") as f:
+        last = repair_contacts_journal(f, user_id)
+        seq = max(last["seq"] if last else 0, snapshot_seq)
+        now = datetime.now().isoformat()
+        entries = []
+        lines = []
+        for op, contact_id in changes:
+            seq += 1
+            entry = {"seq": seq, "op": op, "id": contact_id, "at": now}
+            entries.append(entry)
+            contact = found.get(contact_id) if op != "delete" else None
+            lines.append(json.dumps({**entry, "c": contact} if contact is not None else entry, separators=(",", ":")))
+        data = ("\n".join(lines) + "\n").encode()
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+        journal_size = f.tell()
+    JSON_IO_SECONDS.observe(time.perf_counter() - start, "save", "journal")
+    JSON_IO_BYTES.observe(len(data), "save", "journal")
+
+    if journal_size > max(CONTACT_JOURNAL_COMPACT_MIN_BYTES, CONTACT_JOURNAL_COMPACT_RATIO * snapshot_size):
+        journal_compactor.schedule(user_id)
+    return entries
+
+
+def write_contacts_snapshot(user_id: Optional[str], contacts: List[dict], changes: Optional[List[tuple]]) -> List[dict]:
+    """Rewrite the snapshot and change log, folding in and removing the journal
+
+    Returns the change entries added for changes. The snapshot goes first:
+    after a crash before the journal is removed, its records are all at or
+    below the snapshot's seq and are skipped.
+    """
+    log = load_change_log(user_id)
+    now = datetime.now().isoformat()
+    entries = []
+    for op, contact_id in changes or []:
+        log["seq"] += 1
+        entries.append({"seq": log["seq"], "op": op, "id": contact_id, "at": now})
+    log["changes"].extend(entries)
+    compact_change_log(log)
+
+    write_json_file(get_user_data_file(user_id), {"seq": log["seq"], "contacts": contacts}, "contacts")
+    write_json_file(get_change_log_file(user_id), log, "change_log")
+    try:
+        os.remove(get_contacts_journal_file(user_id))
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def save_contacts(
+    contacts: List[dict],
+    user_id: Optional[str] = None,
+    changes: Optional[List[tuple]] = None
+):
+    """Save contacts to JSON file for a specific user
+
+    changes is a list of (op, contact_id) pairs, op being "insert", "update"
+    or "delete", appended to the user's change log for delta sync. With
+    journal storage only the changed contacts are written.
+    """
+    with user_lock(user_id):
+        entries = None
+        if CONTACT_STORAGE == "journal":
+            entries = append_contacts_journal(user_id, contacts, changes)
+        if entries is None:
+            entries = write_contacts_snapshot(user_id, contacts, changes)
+    if entries:
+        publish_contact_changes(user_id, contacts, entries)
+
+
+def insert_contacts(user_id: Optional[str], new_contacts: List[dict]):
+    """Add new contacts (with fresh ids) to a user's contacts
+
+    With journal storage this only appends the new contacts; the full
+    contact list is loaded and rewritten only when a snapshot is needed.
+    """
+    changes = [("insert", c["id"]) for c in new_contacts]
+    with user_lock(user_id):
+        entries = None
+        if CONTACT_STORAGE == "journal":
+            entries = append_contacts_journal(user_id, new_contacts, changes)
+        if entries is None:
+            entries = write_contacts_snapshot(user_id, load_contacts(user_id) + new_contacts, changes)
+    if entries:
+        publish_contact_changes(user_id, new_contacts, entries)
+
+
+class JournalCompactor:
+    """Background thread that folds oversized journals into new snapshots"""
+
+    def __init__(self):
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def schedule(self, user_id: Optional[str]):
+        with self.lock:
+            self.pending.add(user_id)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="journal-compactor", daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.thread = None
+                    return
+                user_id = self.pending.pop()
+            try:
+                compact_contacts_journal(user_id)
+            except Exception as e:
+                log_event(logging.ERROR, "Journal compaction failed", user_id=user_id, error=str(e))
+
+
+journal_compactor = JournalCompactor()
+
+
+def compact_contacts_journal(user_id: Optional[str]):
+    """Fold a user's journal into a new snapshot if it is still over the threshold"""
+    with user_lock(user_id):
+        try:
+            journal_size = os.path.getsize(get_contacts_journal_file(user_id))
+        except FileNotFoundError:
+            return  # Compacted by another worker process
+        _, snapshot_size = read_snapshot_header(user_id)
+        if journal_size <= max(CONTACT_JOURNAL_COMPACT_MIN_BYTES, CONTACT_JOURNAL_COMPACT_RATIO * snapshot_size):
+            return
+        start = time.perf_counter()
+        write_contacts_snapshot(user_id, read_contacts(user_id), None)
+    CONTACT_JOURNAL_COMPACTIONS.inc()
+    log_event(
+        logging.INFO, "Compacted contacts journal", user_id=user_id, journal_bytes=journal_size,
+        duration_ms=round((time.perf_counter() - start) * 1000, 1),
+    )
+
+
+# Contact change log
+#
+# Every contact write appends (seq, op, id) entries with a per-user,
+# monotonically increasing seq; deletes stay in the log as tombstones.
+# Entries not yet folded into contacts_changes.json live in the contacts
+# journal. Compaction first keeps only the newest entry per contact, then
+# drops the oldest entries; truncated_seq records the highest dropped seq so
+# clients syncing from before it are told to do a full resync.
+CHANGE_LOG_MAX_ENTRIES = int(os.getenv("CHANGE_LOG_MAX_ENTRIES", "5000"))
+
+
+def get_change_log_file(user_id: Optional[str]) -> str:
+    """Get the contact change log path for a specific user"""
     data_file = get_user_data_file(user_id)
-    os.makedirs(os.path.dirname(data_file), exist_ok=True)
-    with open(data_file, "w") as f:
-        json.dump({"contacts": contacts}, f, indent=2)
+    return os.path.join(os.path.dirname(data_file), "contacts_changes.json")
+
+
+def load_change_log(user_id: Optional[str]) -> dict:
+    """Load a user's contact change log, including entries still in the journal"""
+    records = read_contacts_journal(user_id)
+    snapshot_seq, _ = read_snapshot_header(user_id)
+    log_file = get_change_log_file(user_id)
+    log = {"seq": 0, "truncated_seq": 0, "changes": []}
+    try:
+        if os.path.exists(log_file):
+            log = read_json_file(log_file, "change_log")
+    except Exception as e:
+        log_event(logging.ERROR, "Error loading change log", user_id=user_id, error=str(e))
+
+    newer = [{k: r[k] for k in ("seq", "op", "id", "at")} for r in records if r["seq"] > log["seq"]]
+    if newer:
+        log["changes"].extend(newer)
+        log["seq"] = newer[-1]["seq"]
+        compact_change_log(log)
+    if snapshot_seq and snapshot_seq > log["seq"]:
+        # Crashed between writing a snapshot and its change log: the entries
+        # in between are lost, so clients that synced before must resync
+        log["seq"] = log["truncated_seq"] = snapshot_seq
+    return log
+
+
+def compact_change_log(log: dict, max_entries: int = CHANGE_LOG_MAX_ENTRIES):
+    """Shrink a change log in place to at most max_entries entries"""
+    if len(log["changes"]) <= max_entries:
+        return
+
+    # Keep only the newest entry per contact. An insert folded into a later
+    # update keeps the "insert" op so the contact still reads as new.
+    latest = {}
+    inserted = set()
+    for entry in log["changes"]:
+        if entry["op"] == "insert":
+            inserted.add(entry["id"])
+        latest[entry["id"]] = entry
+    changes = sorted(latest.values(), key=lambda e: e["seq"])
+    for entry in changes:
+        if entry["op"] == "update" and entry["id"] in inserted:
+            entry["op"] = "insert"
+
+    if len(changes) > max_entries:
+        dropped = changes[:len(changes) - max_entries]
+        changes = changes[len(changes) - max_entries:]
+        log["truncated_seq"] = max(log["truncated_seq"], dropped[-1]["seq"])
+    log["changes"] = changes
+
+
+def build_contact_record(
+    contact: ContactCreate,
+    user_id: Optional[str],
+    contact_id: Optional[str] = None
+) -> dict:
+    """Build the stored dict for a new contact"""
+    new_contact = contact.model_dump()
+    new_contact["id"] = contact_id or str(uuid.uuid4())
+    new_contact["user_id"] = user_id  # Store user_id with contact
+    new_contact["created_at"] = datetime.now().isoformat()
+    new_contact["updated_at"] = datetime.now().isoformat()
+    return new_contact
+
+
+# Contact write coalescing (group commit)
+#
+# Single-contact creates, updates and deletes are queued per user and
+# applied together: the first mutation in an empty queue waits
+# CONTACT_WRITE_WINDOW_MS for others to join, then one flush loads the
+# contacts once, applies up to CONTACT_WRITE_MAX_BATCH mutations in order
+# and writes the file once. Mutations arriving during a flush form the
+# next batch. Callers await their own mutation's result, which is only
+# set after the write is on disk, so a success response still means the
+# change is durable. CONTACT_WRITE_MAX_BATCH=1 writes once per mutation.
+CONTACT_WRITE_WINDOW_MS = float(os.getenv("CONTACT_WRITE_WINDOW_MS", "5"))
+CONTACT_WRITE_MAX_BATCH = int(os.getenv("CONTACT_WRITE_MAX_BATCH", "256"))
+
+
+def contacts_by_id(contacts: List[dict]) -> dict:
+    """Map contact id -> contact in file order for in-place edits
+
+    Contacts without an id, or repeating one, are kept under placeholder
+    keys so writing list(by_id.values()) back drops nothing.
+    """
+    by_id = {}
+    for i, contact in enumerate(contacts):
+        contact_id = contact.get("id")
+        by_id[contact_id if contact_id and contact_id not in by_id else f"__noid_{i}"] = contact
+    return by_id
+
+
+class ContactWriteBatcher:
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window_ms = window_ms
+        self.max_batch = max(1, max_batch)
+        self.pending = {}  # user_id -> [(mutate, future)]
+        self.flushers = {}  # user_id -> flush task
+
+    async def submit(self, user_id: Optional[str], mutate):
+        """Queue mutate(by_id) -> (result, changes) and return its result once written
+
+        by_id maps contact id -> contact in file order; mutate edits it in
+        place and must raise (e.g. HTTPException) before changing anything
+        if it fails - the exception is re-raised to this caller only.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending.setdefault(user_id, []).append((mutate, future))
+        if user_id not in self.flushers:
+            self.flushers[user_id] = asyncio.create_task(self.flush_loop(user_id))
+        # Shielded so a disconnecting client doesn't cancel the shared future
+        return await asyncio.shield(future)
+
+    async def flush_loop(self, user_id: Optional[str]):
+        try:
+            while self.pending.get(user_id):
+                if self.window_ms > 0:
+                    await asyncio.sleep(self.window_ms / 1000)
+                queue = self.pending[user_id]
+                batch, self.pending[user_id] = queue[:self.max_batch], queue[self.max_batch:]
+                try:
+                    outcomes = await asyncio.to_thread(self.apply_batch, user_id, batch)
+                except Exception as e:
+                    log_event(logging.ERROR, "Contact write failed", user_id=user_id, batch=len(batch), error=str(e))
+                    outcomes = [(False, e)] * len(batch)
+                for (_, future), (ok, value) in zip(batch, outcomes):
+                    if future.done():
+                        continue
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+        finally:
+            for _, future in self.pending.pop(user_id, []):
+                if not future.done():
+                    future.set_exception(RuntimeError("Contact write queue stopped"))
+            del self.flushers[user_id]
+
+    def apply_batch(self, user_id: Optional[str], batch: list) -> List[tuple]:
+        """Apply a batch under the user's lock with one load and one save; [(ok, result or exception)]"""
+        outcomes = []
+        changes = []
+        with user_lock(user_id):
+            by_id = contacts_by_id(load_contacts(user_id))
+            for mutate, _ in batch:
+                try:
+                    result, mutation_changes = mutate(by_id)
+                except Exception as e:
+                    outcomes.append((False, e))
+                    continue
+                outcomes.append((True, result))
+                changes.extend(mutation_changes)
+            if changes:
+                save_contacts(list(by_id.values()), user_id, changes=changes)
+                CONTACT_WRITE_BATCH.observe(sum(ok for ok, _ in outcomes))
+        return outcomes
+
+    async def drain(self):
+        """Wait for queued mutations to be written"""
+        while self.flushers:
+            await asyncio.gather(*self.flushers.values(), return_exceptions=True)
+
+
+contact_writes = ContactWriteBatcher(CONTACT_WRITE_WINDOW_MS, CONTACT_WRITE_MAX_BATCH)
+
+
+# Contact list pagination and projection
+CONTACTS_PAGE_DEFAULT = int(os.getenv("CONTACTS_PAGE_DEFAULT", "50"))
+CONTACTS_PAGE_MAX = int(os.getenv("CONTACTS_PAGE_MAX", "1000"))
+CONTACT_SORTS = ("created", "priority")
+# Element types of contact_sort_key's key per sort, checked on decoded cursors
+CURSOR_KEY_TYPES = {"created": (str, str), "priority": (int, str, str)}
+
+
+def contact_sort_key(contact: dict, sort: str) -> tuple:
+    """Key for newest-first ("created") or highest-priority-first ("priority") order.
+
+    Ties fall back to created_at and then id, so the order is total and
+    stable across requests.
+    """
+    created = contact.get("created_at") or ""
+    contact_id = str(contact.get("id") or "")
+    if sort == "priority":
+        priority = contact.get("priority")
+        return (int(priority) if isinstance(priority, int) else 50, created, contact_id)
+    return (created, contact_id)
+
+
+def encode_cursor(sort: str, key: tuple) -> str:
+    raw = json.dumps([sort, list(key)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    """Decode a cursor from encode_cursor, raising 400 if it's invalid for sort"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key = json.loads(raw)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+    # A key of the wrong shape would raise TypeError when compared in paginate_contacts
+    types = CURSOR_KEY_TYPES[sort]
+    if (
+        not isinstance(key, list)
+        or len(key) != len(types)
+        or not all(type(value) is expected for value, expected in zip(key, types))
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(key)
+
+
+def project_contact(contact: dict, fields: Optional[set]) -> dict:
+    """Copy only the requested fields of a contact (all fields if fields is None)"""
+    if fields is None:
+        return contact
+    return {k: contact[k] for k in fields if k in contact}
+
+
+def paginate_contacts(
+    contacts: List[dict],
+    sort: str,
+    after: Optional[tuple],
+    limit: Optional[int],
+    fields: Optional[set],
+) -> dict:
+    """Return one page of contacts after the cursor key, newest/highest first"""
+    page_size = min(limit or CONTACTS_PAGE_DEFAULT, CONTACTS_PAGE_MAX)
+    keyed = ((contact_sort_key(c, sort), c) for c in contacts)
+    if after is not None:
+        keyed = (kc for kc in keyed if kc[0] < after)
+    # Only the page (plus one to detect more) is ordered, not the whole list
+    page = heapq.nlargest(page_size + 1, keyed, key=lambda kc: kc[0])
+
+    next_cursor = None
+    if len(page) > page_size:
+        page = page[:page_size]
+        next_cursor = encode_cursor(sort, page[-1][0])
+
+    return {
+        "contacts": [project_contact(c, fields) for _, c in page],
+        "next_cursor": next_cursor,
+    }
 
 
 def get_user_preferences_file(user_id: str) -> str:
     """Get the preferences file path for a specific user"""
-    user_dir = os.path.join(DATA_DIR, "users", user_id)
-    os.makedirs(user_dir, exist_ok=True)
-    return os.path.join(user_dir, "preferences.json")
+    return os.path.join(get_user_dir(user_id), "preferences.json")
 
 
 def load_user_preferences(user_id: str) -> dict:
@@ -364,26 +2033,29 @@ def load_user_preferences(user_id: str) -> dict:
     prefs_file = get_user_preferences_file(user_id)
     try:
         if os.path.exists(prefs_file):
-            with open(prefs_file, "r") as f:
-                return json.load(f)
+            return read_json_file(prefs_file, "preferences")
     except Exception as e:
-        print(f"Error loading preferences for user {user_id}: {e}")
+        log_event(logging.ERROR, "Error loading preferences", user_id=user_id, error=str(e))
     return {"industry": None, "custom_tags": [], "suggested_tags": []}
 
 
 def save_user_preferences(user_id: str, preferences: dict):
     """Save user preferences to JSON file"""
     prefs_file = get_user_preferences_file(user_id)
-    os.makedirs(os.path.dirname(prefs_file), exist_ok=True)
-    with open(prefs_file, "w") as f:
-        json.dump(preferences, f, indent=2)
+    ensure_dir(os.path.dirname(prefs_file))
+    write_json_file(prefs_file, preferences, "preferences")
+    if change_broker.wants(user_id):
+        change_broker.publish(user_id, {
+            "type": "preferences",
+            "preferences": preferences,
+            "etag": make_etag("preferences", get_resource_version(user_id, "preferences")),
+            "tags_etag": get_tags_etag(user_id),
+        })
 
 
 def get_business_card_file(user_id: str) -> str:
     """Get the business card file path for a specific user"""
-    user_dir = os.path.join(DATA_DIR, "users", user_id)
-    os.makedirs(user_dir, exist_ok=True)
-    return os.path.join(user_dir, "business_card.json")
+    return os.path.join(get_user_dir(user_id), "business_card.json")
 
 
 def load_business_card(user_id: str) -> Optional[dict]:
@@ -391,24 +2063,451 @@ def load_business_card(user_id: str) -> Optional[dict]:
     card_file = get_business_card_file(user_id)
     try:
         if os.path.exists(card_file):
-            with open(card_file, "r") as f:
-                return json.load(f)
+            return read_json_file(card_file, "business_card")
     except Exception as e:
-        print(f"Error loading business card for user {user_id}: {e}")
+        log_event(logging.ERROR, "Error loading business card", user_id=user_id, error=str(e))
     return None
 
 
 def save_business_card(user_id: str, card: dict):
     """Save business card to JSON file for a specific user"""
     card_file = get_business_card_file(user_id)
-    os.makedirs(os.path.dirname(card_file), exist_ok=True)
-    with open(card_file, "w") as f:
-        json.dump(card, f, indent=2)
+    ensure_dir(os.path.dirname(card_file))
+    write_json_file(card_file, card, "business_card")
+    if change_broker.wants(user_id):
+        change_broker.publish(user_id, {
+            "type": "business_card",
+            "card": card,
+            "etag": make_etag("business_card", get_resource_version(user_id, "business_card")),
+        })
+
+
+# Resource version stamps
+#
+# GET handlers build ETags from the (inode, mtime, size) of a resource's
+# files so they can answer If-None-Match with 304 without reading them.
+# Saves either rename a new file into place (new inode) or append to the
+# contacts journal (new size), so the stamp changes on every write from any
+# worker process and nothing has to be cached or invalidated.
+RESOURCE_FILES = {
+    "contacts": (get_user_data_file, get_contacts_journal_file),
+    "preferences": (get_user_preferences_file,),
+    "business_card": (get_business_card_file,),
+}
+
+
+def get_resource_version(user_id: Optional[str], resource: str) -> int:
+    """Current version stamp of a user's resource (0 if it was never written)"""
+    stats = []
+    for get_path in RESOURCE_FILES[resource]:
+        try:
+            st = os.stat(get_path(user_id))
+            stats.append(f"{st.st_ino}:{st.st_mtime_ns}:{st.st_size}")
+        except FileNotFoundError:
+            stats.append("-")
+    if all(stat == "-" for stat in stats):
+        return 0
+    # A digest rather than hash(), which is salted per process for strings
+    # (and for None), so every worker and restart computes the same version
+    digest = hashlib.blake2b("|".join(stats).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def make_etag(resource: str, *parts) -> str:
+    """Strong ETag from a resource name and its version parts"""
+    return '"' + "-".join([resource] + [format(p, "x") if isinstance(p, int) else str(p) for p in parts]) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+# Contact cache
+#
+# Read-only endpoints (list, search, tags, duplicates, single contact,
+# bootstrap, voice search) take contacts from a per-process cache keyed by
+# the contacts resource version, so a repeat read costs a stat instead of a
+# JSON parse, and any write from any worker makes the next read reload.
+# Cached contacts are CompactContact records rather than dicts: one slot per
+# known field, key layouts and values that repeat across contacts (company,
+# role, industry, location, ...) stored once per user, and tags stored as ids
+# into the user's tag list. Records read like dicts and are turned back into
+# them only when a response is rendered. CONTACT_CACHE_MAX_CONTACTS bounds the
+# contacts held per process, least recently used users go first (0 disables).
+CONTACT_CACHE_MAX_CONTACTS = int(os.getenv("CONTACT_CACHE_MAX_CONTACTS", "200000"))
+CONTACT_FIELDS = tuple(ContactCreate.model_fields) + ("id", "user_id", "created_at", "updated_at")
+CONTACT_FIELD_SET = frozenset(CONTACT_FIELDS)
+INTERNED_CONTACT_FIELDS = frozenset(
+    ("company", "role", "industry", "location", "meeting_location", "met_date", "user_id")
+)
+_missing = object()
+
+
+class CompactContact:
+    """A cached contact: a read-only dict look-alike with one slot per field
+
+    Slots of fields the contact doesn't have stay unset; layout is its key
+    order, tags a tuple of ids into table.tag_names, and fields outside
+    CONTACT_FIELDS go in extra. dict(record) gives back the stored dict.
+    """
+    __slots__ = CONTACT_FIELDS + ("layout", "table", "extra")
+
+    def get(self, key, default=None):
+        if key in CONTACT_FIELD_SET:
+            value = getattr(self, key, default)
+            if key == "tags" and type(value) is tuple:
+                names = self.table.tag_names
+                return [names[i] for i in value]
+            return value
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return key in self.layout
+
+    def __iter__(self):
+        return iter(self.layout)
+
+    def __len__(self) -> int:
+        return len(self.layout)
+
+    def keys(self):
+        return self.layout
+
+    def items(self):
+        return [(key, self[key]) for key in self.layout]
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self.layout}
+
+
+class ContactTable:
+    """A user's contacts as CompactContact records, in stored order"""
+
+    def __init__(self, contacts: List[dict]):
+        self.tag_names = []
+        self.records = []
+        tag_ids, strings, layouts = {}, {}, {}
+        for contact in contacts:
+            record = CompactContact()
+            layout = tuple(contact)
+            record.layout = layouts.setdefault(layout, layout)
+            record.table = self
+            extra = None
+            for key, value in contact.items():
+                if key not in CONTACT_FIELD_SET:
+                    if extra is None:
+                        extra = {}
+                    extra[key] = value
+                elif key == "tags" and type(value) is list and all(type(tag) is str for tag in value):
+                    ids = []
+                    for tag in value:
+                        tag_id = tag_ids.get(tag)
+                        if tag_id is None:
+                            tag_id = tag_ids[tag] = len(self.tag_names)
+                            self.tag_names.append(tag)
+                        ids.append(tag_id)
+                    record.tags = tuple(ids)
+                elif key in INTERNED_CONTACT_FIELDS and type(value) is str:
+                    setattr(record, key, strings.setdefault(value, value))
+                else:
+                    setattr(record, key, value)
+            record.extra = extra
+            self.records.append(record)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def find(self, contact_id: str) -> Optional[CompactContact]:
+        for record in self.records:
+            if getattr(record, "id", None) == contact_id:
+                return record
+        return None
+
+    def search_rows(self, query_lower: str):
+        """search_rows() for cached records: slots read directly, tags matched by id"""
+        matching = [tag if query_lower in tag.lower() else None for tag in self.tag_names]
+        for record in self.records:
+            tags = getattr(record, "tags", None)
+            if type(tags) is tuple:
+                tags = [matching[i] for i in tags if matching[i] is not None][:1]
+            yield (
+                record, getattr(record, "name", None), getattr(record, "company", None),
+                getattr(record, "role", None), getattr(record, "industry", None),
+                getattr(record, "location", None), tags, getattr(record, "raw_context", None),
+            )
+
+    def tag_counts(self) -> dict:
+        """Occurrences of each tag across the contacts, counted by id"""
+        counts = [0] * len(self.tag_names)
+        for record in self.records:
+            tags = getattr(record, "tags", None)
+            if type(tags) is tuple:
+                for tag_id in tags:
+                    counts[tag_id] += 1
+        return {tag: count for tag, count in zip(self.tag_names, counts) if count}
+
+
+class ContactCache:
+    def __init__(self, max_contacts: int):
+        self.max_contacts = max_contacts
+        self.tables = {}  # user_id -> (version, ContactTable), least recently used first
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, user_id: Optional[str], version: Optional[int] = None) -> ContactTable:
+        """The user's contacts, reloaded if the stored version changed"""
+        if version is None:
+            version = get_resource_version(user_id, "contacts")
+        with self.lock:
+            entry = self.tables.pop(user_id, None)
+            if entry is not None:
+                if entry[0] == version:
+                    self.tables[user_id] = entry
+                    CONTACT_CACHE_REQUESTS.inc("hit")
+                    return entry[1]
+                self.size -= len(entry[1])
+        CONTACT_CACHE_REQUESTS.inc("miss")
+
+        try:
+            table = ContactTable(read_contacts(user_id))
+        except Exception as e:
+            log_event(logging.ERROR, "Error loading contacts", user_id=user_id, error=str(e))
+            return ContactTable([])
+        if len(table) > self.max_contacts:
+            return table
+        with self.lock:
+            old = self.tables.pop(user_id, None)
+            if old is not None:
+                self.size -= len(old[1])
+            self.tables[user_id] = (version, table)
+            self.size += len(table)
+            while self.size > self.max_contacts:
+                evicted = self.tables.pop(next(iter(self.tables)))
+                self.size -= len(evicted[1])
+        return table
+
+
+contact_cache = ContactCache(CONTACT_CACHE_MAX_CONTACTS)
+
+
+def load_cached_contacts(user_id: Optional[str], version: Optional[int] = None) -> ContactTable:
+    """A user's contacts for read-only use; never mutate the records"""
+    return contact_cache.get(user_id, version)
+
+
+def count_contact_tags(contacts) -> dict:
+    """Occurrences of each tag (as stored) across contacts"""
+    if isinstance(contacts, ContactTable):
+        return contacts.tag_counts()
+    counts = {}
+    for contact in contacts:
+        for tag in contact.get("tags") or ():
+            counts[tag] = counts.get(tag, 0) + 1
+    return counts
+
+
+# Change feed
+#
+# Contact, preference and business-card writes publish small diff events to
+# the change broker, which fans them out to each user's open
+# /api/changes/events streams. Per-connection queues are bounded: a consumer
+# that falls CHANGE_FEED_QUEUE_SIZE events behind is disconnected with a
+# "resync" event and catches up through /api/contacts/changes.
+#
+# LocalChangeBroker only reaches subscribers in this process. With
+# CHANGE_BROKER_SOCKET set, RelayChangeBroker also forwards events through
+# change_relay.py so several API workers share one feed. Another transport
+# only needs publish/wants/subscribe/unsubscribe/start/stop.
+CHANGE_FEED_QUEUE_SIZE = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "100"))
+CHANGE_FEED_INLINE_CONTACTS = int(os.getenv("CHANGE_FEED_INLINE_CONTACTS", "25"))
+CHANGE_BROKER_SOCKET = os.getenv("CHANGE_BROKER_SOCKET", "")
+
+
+class ChangeSubscription:
+    def __init__(self, user_id: Optional[str], queue_size: int):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+
+class LocalChangeBroker:
+    """In-process pub/sub of change events, keyed by user"""
+
+    def __init__(self, queue_size: int = CHANGE_FEED_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.loop = None
+        self.subscriptions = {}
+        self.counters = {"published": 0, "delivered": 0, "slow_consumers": 0}
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+
+    async def stop(self):
+        self.loop = None
+
+    def wants(self, user_id: Optional[str]) -> bool:
+        """Whether anyone could receive events for user_id (skip building them if not)"""
+        return bool(self.subscriptions.get(user_id))
+
+    def subscribe(self, user_id: Optional[str]) -> ChangeSubscription:
+        sub = ChangeSubscription(user_id, self.queue_size)
+        self.subscriptions.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: ChangeSubscription):
+        subs = self.subscriptions.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self.subscriptions[sub.user_id]
+
+    def publish(self, user_id: Optional[str], event: dict):
+        """Publish an event; safe to call from worker threads
+
+        The event is handed to the loop, so subscriptions and counters are
+        only ever touched from the loop thread.
+        """
+        if self.loop is None:
+            return
+        self.call_in_loop(self.publish_in_loop, user_id, event)
+
+    def publish_in_loop(self, user_id: Optional[str], event: dict):
+        self.counters["published"] += 1
+        self.deliver(user_id, event)
+
+    def call_in_loop(self, fn, *args):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            fn(*args)
+        else:
+            try:
+                self.loop.call_soon_threadsafe(fn, *args)
+            except RuntimeError:
+                pass  # loop closed during shutdown
+
+    def deliver(self, user_id: Optional[str], event: dict):
+        for sub in list(self.subscriptions.get(user_id, ())):
+            try:
+                sub.queue.put_nowait(event)
+                self.counters["delivered"] += 1
+            except asyncio.QueueFull:
+                sub.overflowed = True
+                self.counters["slow_consumers"] += 1
+                self.unsubscribe(sub)
+
+
+class RelayChangeBroker(LocalChangeBroker):
+    """LocalChangeBroker that also shares events with other workers via change_relay.py"""
+
+    def __init__(self, socket_path: str, queue_size: int = CHANGE_FEED_QUEUE_SIZE):
+        super().__init__(queue_size)
+        self.socket_path = socket_path
+        self.writer = None
+        self.task = None
+        self.counters["relay_dropped"] = 0
+
+    async def start(self):
+        await super().start()
+        self.task = asyncio.create_task(self.run_relay())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        await super().stop()
+
+    def wants(self, user_id: Optional[str]) -> bool:
+        return self.writer is not None or super().wants(user_id)
+
+    def publish_in_loop(self, user_id: Optional[str], event: dict):
+        super().publish_in_loop(user_id, event)
+        self.forward(user_id, event)
+
+    def forward(self, user_id: Optional[str], event: dict):
+        if self.writer is None or self.writer.is_closing():
+            self.counters["relay_dropped"] += 1
+            return
+        self.writer.write(json.dumps({"user_id": user_id, "event": event}).encode() + b"\n")
+
+    async def run_relay(self):
+        """Stay connected to the relay, delivering events other workers publish"""
+        backoff = 1
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=2 ** 20)
+                self.writer = writer
+                backoff = 1
+                log_event(logging.INFO, "Change feed connected to relay", socket=self.socket_path)
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    message = json.loads(line)
+                    self.deliver(message["user_id"], message["event"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log_event(logging.WARNING, "Change feed relay error", error=str(e))
+            finally:
+                if self.writer is not None:
+                    self.writer.close()
+                    self.writer = None
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+change_broker = RelayChangeBroker(CHANGE_BROKER_SOCKET) if CHANGE_BROKER_SOCKET else LocalChangeBroker()
+
+
+def publish_contact_changes(user_id: Optional[str], contacts: List[dict], entries: List[dict]):
+    """Publish change-log entries, inlining the changed contacts when there are few"""
+    if not entries or not change_broker.wants(user_id):
+        return
+    changes = [{"seq": e["seq"], "op": e["op"], "id": e["id"]} for e in entries]
+    inline = len(changes) <= CHANGE_FEED_INLINE_CONTACTS
+    if inline:
+        wanted = {c["id"] for c in changes if c["op"] != "delete"}
+        by_id = {c.get("id"): c for c in contacts if c.get("id") in wanted}
+        for change in changes:
+            if change["id"] in by_id:
+                change["contact"] = by_id[change["id"]]
+    change_broker.publish(user_id, {
+        "type": "contacts",
+        "seq": changes[-1]["seq"],
+        "changes": changes,
+        "inline": inline,
+        "tags_etag": get_tags_etag(user_id),
+    })
 
 
 def generate_share_slug(name: str) -> str:
     """Generate a unique share slug from the user's name"""
-    import re
     import random
     import string
 
@@ -423,12 +2522,30 @@ def generate_share_slug(name: str) -> str:
     return f"{slug}-{suffix}"
 
 
+supabase_http = None
+supabase_http_lock = threading.Lock()
+
+
+def get_supabase_http():
+    """Shared httpx client for Supabase REST calls, so lookups reuse connections"""
+    global supabase_http
+    if supabase_http is None:
+        with supabase_http_lock:
+            if supabase_http is None:
+                import httpx
+
+                supabase_http = httpx.Client()
+    return supabase_http
+
+
 def get_card_from_supabase(share_slug: str) -> Optional[dict]:
     """Look up a card from Supabase user_business_cards table using REST API"""
     if not SUPABASE_URL or not SUPABASE_KEY:
-        print("Supabase not configured")
+        log_event(logging.WARNING, "Supabase not configured")
         return None
 
+    start = time.perf_counter()
+    status = "error"
     try:
         url = f"{SUPABASE_URL}/rest/v1/user_business_cards"
         params = {
@@ -442,25 +2559,30 @@ def get_card_from_supabase(share_slug: str) -> Optional[dict]:
             "Content-Type": "application/json"
         }
 
-        with httpx.Client() as client:
-            response = client.get(url, params=params, headers=headers)
+        response = get_supabase_http().get(url, params=params, headers=headers)
+        status = str(response.status_code)
 
         if response.status_code == 200:
             data = response.json()
             if data and len(data) > 0:
-                print(f"Found card for share_slug: {share_slug}")
+                log_event(logging.INFO, "Found card in Supabase", share_slug=share_slug)
                 return data[0]
             else:
-                print(f"No card found for share_slug: {share_slug}")
+                log_event(logging.INFO, "No card found in Supabase", share_slug=share_slug)
         else:
-            print(f"Supabase API error: {response.status_code} - {response.text}")
+            log_event(logging.ERROR, "Supabase API error", status=response.status_code, body=response.text[:500])
     except Exception as e:
-        print(f"Supabase lookup error: {e}")
+        log_event(logging.ERROR, "Supabase lookup error", error=str(e))
+    finally:
+        SUPABASE_LATENCY.observe(time.perf_counter() - start, "get_card", status)
     return None
 
 
-def generate_vcard(card: dict) -> str:
-    """Generate vCard 3.0 format from business card data"""
+def generate_vcard(card: dict, extra_lines: Optional[List[str]] = None) -> str:
+    """Generate vCard 3.0 format from business card data
+
+    extra_lines must already be escaped; every line is folded at 75 octets.
+    """
     lines = [
         "BEGIN:VCARD",
         "VERSION:3.0",
@@ -471,53 +2593,488 @@ def generate_vcard(card: dict) -> str:
         parts = card["full_name"].split(" ", 1)
         first_name = parts[0]
         last_name = parts[1] if len(parts) > 1 else ""
-        lines.append(f"FN:{card['full_name']}")
-        lines.append(f"N:{last_name};{first_name};;;")
+        lines.append(f"FN:{vcard_escape(card['full_name'])}")
+        lines.append(f"N:{vcard_escape(last_name)};{vcard_escape(first_name)};;;")
 
     # Organization and title
     if card.get("company"):
-        lines.append(f"ORG:{card['company']}")
+        lines.append(f"ORG:{vcard_escape(card['company'])}")
     if card.get("title"):
-        lines.append(f"TITLE:{card['title']}")
+        lines.append(f"TITLE:{vcard_escape(card['title'])}")
 
     # Contact info
     if card.get("phone"):
-        lines.append(f"TEL;TYPE=CELL:{card['phone']}")
+        lines.append(f"TEL;TYPE=CELL:{vcard_escape(card['phone'])}")
     if card.get("email"):
-        lines.append(f"EMAIL:{card['email']}")
+        lines.append(f"EMAIL:{vcard_escape(card['email'])}")
     if card.get("website"):
-        lines.append(f"URL:{card['website']}")
+        lines.append(f"URL:{vcard_uri(card['website'])}")
     if card.get("linkedin_url"):
-        lines.append(f"URL;TYPE=LinkedIn:{card['linkedin_url']}")
+        lines.append(f"URL;TYPE=LinkedIn:{vcard_uri(card['linkedin_url'])}")
 
     # Photo
     if card.get("avatar_url"):
-        lines.append(f"PHOTO;VALUE=URI:{card['avatar_url']}")
+        lines.append(f"PHOTO;VALUE=URI:{vcard_uri(card['avatar_url'])}")
 
+    lines.extend(extra_lines or [])
     lines.append("END:VCARD")
-    return "\r\n".join(lines)
+    return "\r\n".join(fold_vcard_line(line) for line in lines)
 
 
-def extract_text_from_image(image_bytes: bytes) -> str:
-    """Extract text from business card using OpenAI Vision API"""
-    import base64
+def vcard_escape(value: str) -> str:
+    """Escape a vCard 3.0 text value"""
+    return (
+        value.replace("\\", "\\\\").replace("\r\n", "\n").replace("\r", "\n").replace("\n", "\\n")
+        .replace(",", "\\,").replace(";", "\\;")
+    )
 
-    # First try OpenAI Vision (much better for business cards)
-    if openai_client:
+
+def vcard_uri(value: str) -> str:
+    """URI values aren't escaped, but a line break would end the property"""
+    return re.sub(r"[\r\n]+", "", value)
+
+
+def fold_vcard_line(line: str, limit: int = 75) -> str:
+    """Fold a content line into lines of at most 75 octets (RFC 6350 section 3.2)"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= limit:
+        return line
+    parts = []
+    start, width = 0, limit
+    while start < len(encoded):
+        end = min(start + width, len(encoded))
+        # Don't split a multi-byte character
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        # Continuation lines start with a space, which counts towards the limit
+        start, width = end, limit - 1
+    return "\r\n ".join(parts)
+
+
+def contact_to_vcard(contact: dict) -> str:
+    """vCard for a saved contact, in the same format as business cards"""
+    card = {
+        "full_name": contact.get("name"),
+        "company": contact.get("company"),
+        "title": contact.get("role"),
+        "phone": contact.get("phone"),
+        "email": contact.get("email"),
+        "linkedin_url": contact.get("linkedin_url"),
+    }
+    extra_lines = []
+    if contact.get("location"):
+        extra_lines.append(f"ADR;TYPE=WORK:;;;{vcard_escape(contact['location'])};;;")
+    if contact.get("tags"):
+        extra_lines.append("CATEGORIES:" + ",".join(vcard_escape(t) for t in contact["tags"]))
+    if contact.get("raw_context"):
+        extra_lines.append(f"NOTE:{vcard_escape(contact['raw_context'])}")
+    if contact.get("id"):
+        extra_lines.append(f"UID:{vcard_escape(contact['id'])}")
+    return generate_vcard(card, extra_lines)
+
+
+EXPORT_CSV_FIELDS = [
+    "id", "name", "email", "phone", "company", "role", "industry", "location",
+    "linkedin_url", "tags", "raw_context", "met_date", "meeting_location",
+    "priority", "created_at", "updated_at",
+]
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+
+def export_contacts(user_id: Optional[str], export_format: str):
+    """Yield an export of a user's contacts in chunks of about EXPORT_FLUSH_BYTES"""
+    row_buffer = io.StringIO()
+    csv_writer = csv.writer(row_buffer)
+
+    def encode(contact: dict) -> str:
+        if export_format == "ndjson":
+            return json.dumps(contact) + "\n"
+        if export_format == "vcf":
+            return contact_to_vcard(contact) + "\r\n"
+        row = []
+        for field in EXPORT_CSV_FIELDS:
+            value = contact.get(field)
+            if field == "tags" and isinstance(value, list):
+                value = ";".join(value)
+            row.append("" if value is None else value)
+        row_buffer.seek(0)
+        row_buffer.truncate()
+        csv_writer.writerow(row)
+        return row_buffer.getvalue()
+
+    chunk = []
+    size = 0
+    if export_format == "csv":
+        csv_writer.writerow(EXPORT_CSV_FIELDS)
+        # Send the header straight away so the first byte isn't delayed
+        yield row_buffer.getvalue()
+    for contact in iter_contacts(user_id):
+        piece = encode(contact)
+        chunk.append(piece)
+        size += len(piece)
+        if size >= EXPORT_FLUSH_BYTES:
+            yield "".join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield "".join(chunk)
+
+
+# Contact import
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+DEFAULT_PHONE_COUNTRY_CODE = os.getenv("DEFAULT_PHONE_COUNTRY_CODE", "1")
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(512 * 1024 * 1024)))
+
+CSV_FIELD_ALIASES = {
+    "name": ["name", "full name", "display name", "fn"],
+    "first_name": ["first name", "given name"],
+    "last_name": ["last name", "family name", "surname"],
+    "email": ["email", "e-mail", "email address", "e-mail address", "e-mail 1 - value", "email 1 - value"],
+    "phone": ["phone", "mobile", "mobile phone", "phone number", "phone 1 - value", "primary phone"],
+    "company": ["company", "organization", "organisation", "organization 1 - name"],
+    "role": ["role", "title", "job title", "organization 1 - title"],
+    "industry": ["industry"],
+    "location": ["location", "city", "address", "home city", "business city"],
+    "linkedin_url": ["linkedin_url", "linkedin", "linkedin url", "website 1 - value"],
+    "tags": ["tags", "categories", "labels", "group membership"],
+    "raw_context": ["raw_context", "notes", "note"],
+    "met_date": ["met_date", "met date"],
+    "meeting_location": ["meeting_location", "meeting location"],
+    "priority": ["priority"],
+}
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    if not email:
+        return None
+    email = email.strip().lower()
+    return email if "@" in email else None
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Best-effort E.164 form of a phone number, used as a dedupe key
+
+    Numbers without a leading + are assumed to be in DEFAULT_PHONE_COUNTRY_CODE
+    when they have 10 digits.
+    """
+    if not phone:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    if len(digits) < 7:
+        return None
+    if phone.strip().startswith("+"):
+        return f"+{digits}"
+    if phone.strip().startswith("00"):
+        return f"+{digits[2:]}"
+    if len(digits) == 10:
+        return f"+{DEFAULT_PHONE_COUNTRY_CODE}{digits}"
+    if len(digits) == 11 and digits.startswith(DEFAULT_PHONE_COUNTRY_CODE):
+        return f"+{digits}"
+    return f"+{digits}"
+
+
+def _vcard_unescape(value: str) -> str:
+    return re.sub(r"\\([\\,;nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def parse_vcards(lines):
+    """Yield one contact dict per BEGIN:VCARD ... END:VCARD block from an iterable of lines"""
+    def properties():
+        current = None
+        for raw in lines:
+            line = raw.rstrip("\r\n")
+            if line[:1] in (" ", "\t") and current is not None:
+                # Folded continuation line
+                current += line[1:]
+                continue
+            if current is not None:
+                yield current
+            current = line
+        if current is not None:
+            yield current
+
+    card = None
+    for prop in properties():
+        if ":" not in prop:
+            continue
+        key, value = prop.split(":", 1)
+        name = key.split(";", 1)[0].split(".")[-1].upper()
+        params = key.upper()
+
+        if name == "BEGIN":
+            card = {"tags": []}
+        elif card is None:
+            continue
+        elif name == "END":
+            if not card.get("name") and card.get("_n"):
+                card["name"] = card["_n"]
+            card.pop("_n", None)
+            yield card
+            card = None
+        elif name == "FN":
+            card["name"] = _vcard_unescape(value).strip()
+        elif name == "N":
+            parts = [_vcard_unescape(p).strip() for p in re.split(r"(?<!\\);", value)]
+            card["_n"] = " ".join(p for p in (parts[1:2] + parts[:1]) if p)
+        elif name == "ORG":
+            card.setdefault("company", _vcard_unescape(re.split(r"(?<!\\);", value)[0]).strip())
+        elif name == "TITLE":
+            card.setdefault("role", _vcard_unescape(value).strip())
+        elif name == "TEL":
+            card.setdefault("phone", _vcard_unescape(value).strip())
+        elif name == "EMAIL":
+            card.setdefault("email", _vcard_unescape(value).strip())
+        elif name == "URL" and ("LINKEDIN" in params or "linkedin.com" in value.lower()):
+            card.setdefault("linkedin_url", value.strip())
+        elif name == "ADR":
+            parts = [_vcard_unescape(p).strip() for p in re.split(r"(?<!\\);", value)]
+            location = ", ".join(p for p in parts[3:5] if p)
+            if location:
+                card.setdefault("location", location)
+        elif name == "NOTE":
+            card["raw_context"] = _vcard_unescape(value)
+        elif name == "CATEGORIES":
+            card["tags"].extend(_vcard_unescape(t).strip() for t in re.split(r"(?<!\\),", value) if t.strip())
+
+
+def parse_contact_csv(text_stream):
+    """Yield one contact dict per CSV row, mapping common header names"""
+    reader = csv.DictReader(text_stream)
+    if not reader.fieldnames:
+        return
+    columns = {}
+    normalized = {h.strip().lower(): h for h in reader.fieldnames if h}
+    for field, aliases in CSV_FIELD_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[field] = normalized[alias]
+                break
+
+    for row in reader:
+        contact = {}
+        for field, column in columns.items():
+            value = (row.get(column) or "").strip()
+            if value:
+                contact[field] = value
+        first = contact.pop("first_name", "")
+        last = contact.pop("last_name", "")
+        if not contact.get("name") and (first or last):
+            contact["name"] = f"{first} {last}".strip()
+        if "tags" in contact:
+            contact["tags"] = [t.strip() for t in re.split(r"[;,]|:::", contact["tags"]) if t.strip()]
+        if "priority" in contact:
+            try:
+                contact["priority"] = int(contact["priority"])
+            except ValueError:
+                contact.pop("priority")
+        yield contact
+
+
+def import_contacts(user_id: Optional[str], text_stream, import_format: str):
+    """Import parsed contacts in batches, yielding a progress dict after each batch
+
+    Rows matching an existing (or earlier imported) contact by normalized
+    email or phone are skipped as duplicates.
+    """
+    seen_emails = set()
+    seen_phones = set()
+    for contact in iter_contacts(user_id):
+        email = normalize_email(contact.get("email"))
+        phone = normalize_phone(contact.get("phone"))
+        if email:
+            seen_emails.add(email)
+        if phone:
+            seen_phones.add(phone)
+
+    rows = parse_vcards(text_stream) if import_format == "vcf" else parse_contact_csv(text_stream)
+    progress = {"processed": 0, "imported": 0, "duplicates": 0, "errors": 0}
+    batch = []
+
+    for row in rows:
+        progress["processed"] += 1
+        if not row.get("name"):
+            row["name"] = row.get("email") or row.get("phone") or ""
         try:
-            # Convert image to base64
-            base64_image = base64.b64encode(image_bytes).decode('utf-8')
+            contact = ContactCreate(**row)
+        except ValidationError:
+            progress["errors"] += 1
+            continue
+        if not contact.name:
+            progress["errors"] += 1
+            continue
+
+        email = normalize_email(contact.email)
+        phone = normalize_phone(contact.phone)
+        if (email and email in seen_emails) or (phone and phone in seen_phones):
+            progress["duplicates"] += 1
+            continue
+        if email:
+            seen_emails.add(email)
+        if phone:
+            seen_phones.add(phone)
+
+        batch.append(build_contact_record(contact, user_id))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            insert_contacts(user_id, batch)
+            progress["imported"] += len(batch)
+            batch = []
+            yield dict(progress)
+
+    if batch:
+        insert_contacts(user_id, batch)
+        progress["imported"] += len(batch)
+    yield dict(progress)
+
+
+# Duplicate detection and merge
+#
+# Contacts are grouped by blocking keys (normalized email, E.164 phone,
+# sorted name tokens + normalized company) with a union-find, so finding
+# candidate groups is linear in the number of contacts rather than pairwise.
+COMPANY_SUFFIX_RE = re.compile(
+    r"\b(inc|llc|ltd|corp|corporation|co|company|gmbh|plc|group|holdings)\b\.?", re.IGNORECASE
+)
+NAME_TOKEN_RE = re.compile(r"[^\W\d_]+")
+WORD_TOKEN_RE = re.compile(r"\w+")
 
-            # Detect image type
-            image = Image.open(io.BytesIO(image_bytes))
-            img_format = image.format.lower() if image.format else 'jpeg'
-            if img_format == 'jpg':
-                img_format = 'jpeg'
 
-            response = openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
+def name_company_key(contact: dict) -> Optional[str]:
+    """Order-insensitive name plus normalized company, or None if either is missing"""
+    name = (contact.get("name") or "").lower()
+    company = COMPANY_SUFFIX_RE.sub("", (contact.get("company") or "").lower())
+    name_tokens = sorted(NAME_TOKEN_RE.findall(name))
+    company_tokens = WORD_TOKEN_RE.findall(company)
+    if len(name_tokens) < 2 or not company_tokens or name == "unknown":
+        return None
+    return f"{' '.join(name_tokens)}|{' '.join(company_tokens)}"
+
+
+def contact_blocking_keys(contact: dict) -> List[str]:
+    keys = []
+    email = normalize_email(contact.get("email"))
+    if email:
+        keys.append(f"email:{email}")
+    phone = normalize_phone(contact.get("phone"))
+    if phone:
+        keys.append(f"phone:{phone}")
+    name_key = name_company_key(contact)
+    if name_key:
+        keys.append(f"name:{name_key}")
+    return keys
+
+
+def find_duplicate_groups(contacts: List[dict]) -> List[dict]:
+    """Groups of contact ids that share at least one blocking key"""
+    parent = list(range(len(contacts)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    first_with_key = {}
+    matched_keys = set()
+    keys_by_index = [
+        contact_blocking_keys(c) if c.get("id") else [] for c in contacts
+    ]
+    for i, keys in enumerate(keys_by_index):
+        for key in keys:
+            if key in first_with_key:
+                root_a, root_b = find(i), find(first_with_key[key])
+                if root_a != root_b:
+                    parent[root_a] = root_b
+                matched_keys.add(key)
+            else:
+                first_with_key[key] = i
+
+    groups = {}
+    for i, contact in enumerate(contacts):
+        if contact.get("id"):
+            groups.setdefault(find(i), []).append(i)
+
+    result = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        reasons = sorted({
+            key for i in members for key in keys_by_index[i] if key in matched_keys
+        })
+        result.append({
+            "contact_ids": [contacts[i]["id"] for i in members],
+            "reasons": reasons,
+            "contacts": [dict(contacts[i]) for i in members],
+        })
+    return result
+
+
+def merge_contact_records(records: List[dict], primary_id: str) -> dict:
+    """Combine duplicate contacts: newest non-empty fields, union of tags and notes"""
+    newest_first = sorted(
+        records,
+        key=lambda c: c.get("updated_at") or c.get("created_at") or "",
+        reverse=True
+    )
+    merged = {}
+    for record in newest_first:
+        for key, value in record.items():
+            if key not in merged or merged[key] in (None, "", []):
+                merged[key] = value
+
+    tags = []
+    seen_tags = set()
+    notes = []
+    for record in newest_first:
+        for tag in record.get("tags") or []:
+            if tag.lower() not in seen_tags:
+                seen_tags.add(tag.lower())
+                tags.append(tag)
+        note = (record.get("raw_context") or "").strip()
+        if note and note not in notes:
+            notes.append(note)
+
+    priorities = [r["priority"] for r in records if isinstance(r.get("priority"), int)]
+    created = [r["created_at"] for r in records if r.get("created_at")]
+
+    merged["id"] = primary_id
+    merged["tags"] = tags
+    merged["raw_context"] = "\n\n".join(notes) or None
+    if priorities:
+        merged["priority"] = max(priorities)
+    if created:
+        merged["created_at"] = min(created)
+    merged["updated_at"] = datetime.now().isoformat()
+    return merged
+
+
+def extract_text_from_image(image_bytes: bytes) -> str:
+    """Extract text from business card using OpenAI Vision API
+
+    Falls back to Tesseract; if that fails too after Vision was down or
+    slow, raises 503 rather than 500 so callers know a retry may work.
+    """
+    from PIL import Image
+
+    vision_error = None
+    # First try OpenAI Vision (much better for business cards)
+    if OPENAI_API_KEY:
+        try:
+            # Convert image to base64
+            base64_image = base64.b64encode(image_bytes).decode('utf-8')
+
+            # Detect image type
+            image = Image.open(io.BytesIO(image_bytes))
+            img_format = image.format.lower() if image.format else 'jpeg'
+            if img_format == 'jpg':
+                img_format = 'jpeg'
+
+            response = call_openai(
+                "vision",
+                get_openai_client().chat.completions.create,
+                model="gpt-4o",
+                messages=[
+                    {
                         "role": "user",
                         "content": [
                             {
@@ -548,34 +3105,242 @@ Return the extracted text in a clean, readable format. If you can't read somethi
 
             return response.choices[0].message.content.strip()
         except Exception as e:
-            print(f"OpenAI Vision error: {e}, falling back to Tesseract")
+            vision_error = e
+            log_event(logging.WARNING, "OpenAI Vision error, falling back to Tesseract", error=str(e))
 
     # Fallback to Tesseract
     try:
+        import pytesseract
+
         image = Image.open(io.BytesIO(image_bytes))
+        start = time.perf_counter()
         text = pytesseract.image_to_string(image)
+        TESSERACT_SECONDS.observe(time.perf_counter() - start)
         return text.strip()
     except Exception as e:
-        print(f"OCR Error: {e}")
+        log_event(logging.ERROR, "OCR error", error=str(e))
+        if vision_error is not None and is_transient_error(vision_error):
+            raise HTTPException(status_code=503, detail="OCR is temporarily unavailable")
         raise HTTPException(status_code=500, detail=f"OCR failed: {str(e)}")
 
 
-def extract_info_with_ai(context: str, card_text: Optional[str] = None) -> dict:
-    """Use OpenAI to extract structured info from text"""
-    if not openai_client:
+# Local (rule-based) extraction - used before falling back to the LLM
+LOCAL_EXTRACT_THRESHOLD = float(os.getenv("LOCAL_EXTRACT_THRESHOLD", "0.75"))
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)|\d{2,4})[\s.-]?\d{3,4}[\s.-]?\d{3,4}")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[A-Za-z0-9_%-]+/?", re.IGNORECASE)
+URL_RE = re.compile(r"(?:https?://)?(?:www\.)?[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}(?:/\S*)?", re.IGNORECASE)
+ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+LOCATION_RE = re.compile(r"\b([A-Z][A-Za-z .'-]+,\s*[A-Z]{2})\b")
+NAME_RE = re.compile(r"^[A-Z][A-Za-z.'-]*(?:\s+[A-Z][A-Za-z.'-]*){1,3}$")
+TITLE_RE = re.compile(
+    r"\b(ceo|cto|cfo|coo|cmo|cio|vp|svp|evp|founder|co-founder|president|director|manager|"
+    r"head|lead|chief|officer|engineer|developer|designer|architect|analyst|consultant|"
+    r"partner|associate|principal|agent|broker|attorney|counsel|realtor|specialist|"
+    r"executive|representative|coordinator|advisor|owner|chef|physician|doctor|nurse|"
+    r"professor|scientist|recruiter|accountant|editor|producer)\b",
+    re.IGNORECASE,
+)
+COMPANY_RE = re.compile(
+    r"\b(inc|llc|ltd|corp|corporation|co|company|group|gmbh|plc|partners|labs|"
+    r"technologies|solutions|ventures|capital|realty|bank|studio|agency|holdings)\b\.?",
+    re.IGNORECASE,
+)
+FREE_EMAIL_DOMAINS = {
+    "gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "icloud.com",
+    "aol.com", "me.com", "live.com", "protonmail.com", "msn.com",
+}
+
+# Map every industry default tag to the industries that suggest it.
+# Acronyms ("AI", "DO", "PR") are matched case-sensitively so ordinary
+# words in notes don't turn into tags.
+DEFAULT_TAG_INDUSTRIES = {}
+for _industry, _tags in INDUSTRY_DEFAULT_TAGS.items():
+    for _tag in _tags:
+        DEFAULT_TAG_INDUSTRIES.setdefault(_tag, []).append(_industry)
+
+
+def _compile_tag_pattern(tags: List[str], flags: int = 0):
+    if not tags:
+        return None
+    alternatives = "|".join(re.escape(t) for t in sorted(tags, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)({alternatives})(?!\w)", flags)
+
+
+DEFAULT_TAG_RE_EXACT = _compile_tag_pattern([t for t in DEFAULT_TAG_INDUSTRIES if t != t.lower()])
+DEFAULT_TAG_RE_ANYCASE = _compile_tag_pattern(
+    [t for t in DEFAULT_TAG_INDUSTRIES if t == t.lower()], re.IGNORECASE
+)
+DEFAULT_TAG_LOOKUP = {t.lower(): t for t in DEFAULT_TAG_INDUSTRIES}
+
+# Counts of /api/extract requests answered locally vs. by the LLM
+extraction_stats = {"local": 0, "llm": 0}
+extraction_stats_lock = threading.Lock()  # extractions run in worker threads
+
+
+def count_extraction(path: str):
+    with extraction_stats_lock:
+        extraction_stats[path] += 1
+
+
+def get_extraction_stats() -> dict:
+    with extraction_stats_lock:
+        return dict(extraction_stats)
+
+
+def extract_info_locally(
+    context: str,
+    card_text: Optional[str] = None,
+    custom_tags: Optional[List[str]] = None,
+    industry: Optional[str] = None,
+) -> tuple:
+    """Deterministic extraction of contact fields from card/context text.
+
+    Returns (result, confidence) where confidence is in [0, 1].
+    """
+    source_text = card_text or context or ""
+    full_text = f"{context or ''}\n{card_text or ''}"
+    result = {
+        "name": None,
+        "email": None,
+        "phone": None,
+        "company": None,
+        "role": None,
+        "industry": None,
+        "location": None,
+        "linkedin_url": None,
+        "tags": [],
+    }
+
+    email_match = EMAIL_RE.search(full_text)
+    if email_match:
+        result["email"] = email_match.group(0)
+
+    linkedin_match = LINKEDIN_RE.search(full_text)
+    if linkedin_match:
+        url = linkedin_match.group(0)
+        result["linkedin_url"] = url if url.lower().startswith("http") else f"https://{url}"
+
+    for phone_match in PHONE_RE.finditer(full_text):
+        if ISO_DATE_RE.fullmatch(phone_match.group(0).strip()):
+            continue
+        if len(re.sub(r"\D", "", phone_match.group(0))) >= 7:
+            result["phone"] = phone_match.group(0).strip()
+            break
+
+    location_match = LOCATION_RE.search(source_text)
+    if location_match:
+        result["location"] = location_match.group(1).strip()
+
+    # Classify the remaining card lines as name / title / company
+    for raw_line in source_text.splitlines():
+        line = raw_line.strip().strip("|•·,")
+        if not line or EMAIL_RE.search(line) or LINKEDIN_RE.search(line):
+            continue
+        if PHONE_RE.search(line) and len(re.sub(r"\D", "", line)) >= 7:
+            continue
+        if URL_RE.fullmatch(line):
+            continue
+
+        if not result["role"] and TITLE_RE.search(line) and len(line) <= 60:
+            result["role"] = line
+        elif not result["company"] and COMPANY_RE.search(line) and len(line) <= 60:
+            result["company"] = line
+        elif not result["name"] and NAME_RE.match(line) and not TITLE_RE.search(line):
+            result["name"] = line.title() if line.isupper() else line
+
+    # Fall back to the email domain for the company name
+    if not result["company"] and result["email"]:
+        domain = result["email"].split("@", 1)[1].lower()
+        if domain not in FREE_EMAIL_DOMAINS:
+            result["company"] = domain.split(".")[0].replace("-", " ").title()
+
+    # Tags: industry defaults and the user's own custom tags found in the text
+    tags = []
+    industry_votes = {}
+    for pattern in (DEFAULT_TAG_RE_EXACT, DEFAULT_TAG_RE_ANYCASE):
+        if not pattern:
+            continue
+        for match in pattern.finditer(full_text):
+            tag = DEFAULT_TAG_LOOKUP[match.group(1).lower()]
+            if tag.lower() not in tags:
+                tags.append(tag.lower())
+                # A tag several industries suggest says nothing about which one
+                if len(DEFAULT_TAG_INDUSTRIES[tag]) == 1:
+                    ind = DEFAULT_TAG_INDUSTRIES[tag][0]
+                    industry_votes[ind] = industry_votes.get(ind, 0) + 1
+
+    custom_pattern = _compile_tag_pattern(custom_tags or [], re.IGNORECASE)
+    if custom_pattern:
+        for match in custom_pattern.finditer(full_text):
+            tag = match.group(1).lower()
+            if tag not in tags:
+                tags.append(tag)
+
+    if industry:
+        result["industry"] = industry
+    elif industry_votes:
+        ranked = sorted(industry_votes.items(), key=lambda kv: kv[1], reverse=True)
+        best, votes = ranked[0]
+        # Only a clear winner; ties leave the industry unset
+        if best != "general" and (len(ranked) == 1 or votes > ranked[1][1]):
+            result["industry"] = best.replace("_", " ").title()
+
+    if result["industry"] and result["industry"].lower() not in tags:
+        tags.append(result["industry"].lower())
+    result["tags"] = tags
+
+    confidence = 0.0
+    if result["name"]:
+        confidence += 0.4
+    if result["email"]:
+        confidence += 0.2
+    if result["phone"]:
+        confidence += 0.15
+    if result["role"]:
+        confidence += 0.15
+    if result["company"]:
+        confidence += 0.1
+
+    return result, round(confidence, 2)
+
+
+def extract_info_with_ai(
+    context: str,
+    card_text: Optional[str] = None,
+    custom_tags: Optional[List[str]] = None,
+    industry: Optional[str] = None,
+) -> dict:
+    """Use OpenAI to extract structured info from text.
+
+    Cards whose text is structured enough are handled by the local extractor
+    and never reach the LLM.
+    """
+    local_result, confidence = extract_info_locally(context, card_text, custom_tags, industry)
+    if confidence >= LOCAL_EXTRACT_THRESHOLD:
+        count_extraction("local")
+        return local_result
+
+    count_extraction("llm")
+    fallback = local_result if local_result["name"] else {
+        "name": "Unknown",
+        "tags": ["contact"],
+        "raw_context": context,
+    }
+
+    if not OPENAI_API_KEY:
         # Fallback: basic extraction without AI
-        return {
-            "name": "Unknown",
-            "tags": ["contact"],
-            "raw_context": context,
-        }
+        return fallback
 
     combined_text = context
     if card_text:
         combined_text += f"\n\nBusiness Card Text:\n{card_text}"
 
     try:
-        response = openai_client.chat.completions.create(
+        response = call_openai(
+            "chat",
+            get_openai_client().chat.completions.create,
             model="gpt-4o",
             messages=[
                 {
@@ -626,58 +3391,69 @@ Be generous with tags - more relevant tags = better searchability."""
         result = json.loads(response.choices[0].message.content)
         return result
     except Exception as e:
-        print(f"AI extraction error: {e}")
-        return {
-            "name": "Unknown",
-            "tags": ["contact"],
-            "raw_context": context,
-        }
+        log_event(logging.ERROR, "AI extraction error", error=str(e))
+        return fallback
+
+
+def search_rows(contacts, query_lower: str):
+    """(contact, name, company, role, industry, location, tags, raw_context) per contact
+
+    For a ContactTable, tags holds at most the first tag containing query_lower.
+    """
+    if isinstance(contacts, ContactTable):
+        return contacts.search_rows(query_lower)
+    return (
+        (c, c.get("name"), c.get("company"), c.get("role"), c.get("industry"),
+         c.get("location"), c.get("tags"), c.get("raw_context"))
+        for c in contacts
+    )
 
 
 def search_contacts(query: str, contacts: List[dict]) -> List[dict]:
     """Search contacts by query"""
+    start = time.perf_counter()
     query_lower = query.lower()
     results = []
 
-    for contact in contacts:
+    for contact, name, company, role, industry, location, tags, notes in search_rows(contacts, query_lower):
         score = 0
         match_reason = []
 
         # Check name
-        if contact.get("name") and query_lower in contact["name"].lower():
+        if name and query_lower in name.lower():
             score += 100
             match_reason.append("name")
 
         # Check company
-        if contact.get("company") and query_lower in contact["company"].lower():
+        if company and query_lower in company.lower():
             score += 80
             match_reason.append("company")
 
         # Check role
-        if contact.get("role") and query_lower in contact["role"].lower():
+        if role and query_lower in role.lower():
             score += 70
             match_reason.append("role")
 
         # Check industry
-        if contact.get("industry") and query_lower in contact["industry"].lower():
+        if industry and query_lower in industry.lower():
             score += 60
             match_reason.append("industry")
 
         # Check location
-        if contact.get("location") and query_lower in contact["location"].lower():
+        if location and query_lower in location.lower():
             score += 50
             match_reason.append("location")
 
         # Check tags
-        if contact.get("tags"):
-            for tag in contact["tags"]:
+        if tags:
+            for tag in tags:
                 if query_lower in tag.lower():
                     score += 40
                     match_reason.append(f"tag:{tag}")
                     break
 
         # Check raw context
-        if contact.get("raw_context") and query_lower in contact["raw_context"].lower():
+        if notes and query_lower in notes.lower():
             score += 20
             match_reason.append("notes")
 
@@ -690,9 +3466,535 @@ def search_contacts(query: str, contacts: List[dict]) -> List[dict]:
 
     # Sort by score descending
     results.sort(key=lambda x: x["score"], reverse=True)
+    SEARCH_SECONDS.observe(time.perf_counter() - start)
+    SEARCH_CANDIDATES.observe(len(contacts))
     return results
 
 
+# Audio transcription
+#
+# Uploads are spooled to a private temp directory in fixed-size chunks. Long
+# recordings are cut into overlapping segments (ffmpeg when available, the
+# stdlib wave module for WAV uploads) that are transcribed concurrently and
+# stitched back together by dropping the words repeated in each overlap.
+TRANSCRIBE_MAX_BYTES = int(os.getenv("TRANSCRIBE_MAX_BYTES", str(50 * 1024 * 1024)))
+WHISPER_MAX_BYTES = 25 * 1024 * 1024
+TRANSCRIBE_CHUNK_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "60"))
+TRANSCRIBE_OVERLAP_SECONDS = float(os.getenv("TRANSCRIBE_OVERLAP_SECONDS", "2"))
+TRANSCRIBE_CONCURRENCY = int(os.getenv("TRANSCRIBE_CONCURRENCY", "4"))
+UPLOAD_READ_SIZE = 1024 * 1024
+# Room for multipart boundaries and part headers around the file itself
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+UPLOAD_MAX_BYTES = {
+    "/api/transcribe": TRANSCRIBE_MAX_BYTES,
+    "/api/voice-search/audio": TRANSCRIBE_MAX_BYTES,
+    "/api/contacts/import": IMPORT_MAX_BYTES,
+}
+
+
+async def spool_upload(upload: UploadFile, temp_dir: str, max_bytes: int) -> str:
+    """Stream an upload into a uniquely named file in temp_dir, enforcing a size cap"""
+    ext = os.path.splitext(upload.filename or "")[1].lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,5}", ext):
+        ext = ".m4a"
+    path = os.path.join(temp_dir, f"upload{ext}")
+
+    written = 0
+    f = await asyncio.to_thread(open, path, "wb")
+    try:
+        while True:
+            block = await upload.read(UPLOAD_READ_SIZE)
+            if not block:
+                break
+            written += len(block)
+            if written > max_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large (max {max_bytes // (1024 * 1024)} MB)"
+                )
+            await asyncio.to_thread(f.write, block)
+    finally:
+        await asyncio.to_thread(f.close)
+    return path
+
+
+def get_audio_duration(path: str) -> Optional[float]:
+    """Duration in seconds, or None if it can't be determined"""
+    if path.endswith(".wav"):
+        try:
+            with wave.open(path, "rb") as w:
+                return w.getnframes() / float(w.getframerate())
+        except (wave.Error, EOFError):
+            pass
+
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    try:
+        out = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+            capture_output=True, text=True, timeout=30, check=True,
+        )
+        return float(out.stdout.strip())
+    except (subprocess.SubprocessError, ValueError) as e:
+        log_event(logging.WARNING, "ffprobe failed", path=path, error=str(e))
+        return None
+
+
+def can_split_audio(path: str) -> bool:
+    return bool(shutil.which("ffmpeg")) or path.endswith(".wav")
+
+
+def extract_audio_segment(path: str, start: float, length: float, dest: str) -> str:
+    """Write [start, start + length) seconds of path to dest as WAV"""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg:
+        subprocess.run(
+            [ffmpeg, "-y", "-v", "error", "-ss", f"{start:.3f}", "-t", f"{length:.3f}",
+             "-i", path, "-ac", "1", "-ar", "16000", dest],
+            capture_output=True, timeout=120, check=True,
+        )
+        return dest
+
+    with wave.open(path, "rb") as src:
+        rate = src.getframerate()
+        src.setpos(min(int(start * rate), src.getnframes()))
+        frames = src.readframes(int(length * rate))
+        with wave.open(dest, "wb") as out:
+            out.setparams(src.getparams())
+            out.writeframes(frames)
+    return dest
+
+
+def plan_audio_segments(duration: float) -> List[tuple]:
+    """(start, length) pairs covering duration with the configured overlap"""
+    step = max(TRANSCRIBE_CHUNK_SECONDS - TRANSCRIBE_OVERLAP_SECONDS, 1.0)
+    segments = []
+    start = 0.0
+    while start < duration:
+        segments.append((start, min(TRANSCRIBE_CHUNK_SECONDS, duration - start)))
+        if start + TRANSCRIBE_CHUNK_SECONDS >= duration:
+            break
+        start += step
+    return segments
+
+
+def transcribe_file(path: str) -> str:
+    """Send one audio file to Whisper"""
+    with open(path, "rb") as f:
+        try:
+            transcript = call_openai(
+                "transcription",
+                get_openai_client().audio.transcriptions.create,
+                model="whisper-1",
+                file=f
+            )
+        except CircuitOpenError:
+            raise HTTPException(status_code=503, detail="Transcription is temporarily unavailable")
+    return transcript.text
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stitch_transcripts(previous: str, current: str, max_overlap_words: int = 15) -> str:
+    """Drop the leading words of current that repeat the tail of previous"""
+    prev_words = previous.split()
+    curr_words = current.split()
+    prev_norm = [_normalize_word(w) for w in prev_words[-max_overlap_words:]]
+    curr_norm = [_normalize_word(w) for w in curr_words[:max_overlap_words]]
+
+    for size in range(min(len(prev_norm), len(curr_norm)), 0, -1):
+        if prev_norm[-size:] == curr_norm[:size]:
+            return " ".join(curr_words[size:])
+    return current
+
+
+async def transcribe_segments(path: str, temp_dir: str):
+    """Yield (index, text) per segment in order, transcribing segments concurrently"""
+    duration = get_audio_duration(path)
+    if not duration or duration <= TRANSCRIBE_CHUNK_SECONDS or not can_split_audio(path):
+        if os.path.getsize(path) > WHISPER_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Audio file too large to transcribe")
+        yield 0, await asyncio.to_thread(transcribe_file, path)
+        return
+
+    semaphore = asyncio.Semaphore(TRANSCRIBE_CONCURRENCY)
+
+    async def run_segment(index: int, start: float, length: float) -> str:
+        async with semaphore:
+            dest = os.path.join(temp_dir, f"segment-{index:04d}.wav")
+            await asyncio.to_thread(extract_audio_segment, path, start, length, dest)
+            return await asyncio.to_thread(transcribe_file, dest)
+
+    tasks = [
+        asyncio.create_task(run_segment(i, start, length))
+        for i, (start, length) in enumerate(plan_audio_segments(duration))
+    ]
+    try:
+        for i, task in enumerate(tasks):
+            yield i, await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def transcribe_path(path: str, temp_dir: str) -> str:
+    """Full stitched transcript of a spooled upload"""
+    text = ""
+    async for _, segment_text in transcribe_segments(path, temp_dir):
+        piece = stitch_transcripts(text, segment_text) if text else segment_text
+        text = f"{text} {piece}".strip()
+    return text
+
+
+# Background card-scan jobs
+#
+# Each job is a JSON file under data/jobs holding its status and the
+# checkpointed result of every completed stage. On startup unfinished jobs
+# are re-queued and resume at the first stage without a checkpoint. A stage
+# that fails because OpenAI is down or slow re-queues the job after
+# JOB_RETRY_SECONDS x attempts, until JOB_MAX_ATTEMPTS is reached.
+JOBS_DIR = os.path.join(DATA_DIR, "jobs")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_SECONDS = float(os.getenv("JOB_RETRY_SECONDS", "5"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+
+job_queue: Optional[asyncio.Queue] = None
+job_worker_tasks = []
+job_updates = {}  # job_id -> asyncio.Event, set on every job write
+
+
+def get_job_file(job_id: str) -> str:
+    """Get the state file path for a job"""
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+
+def get_job_image_file(job_id: str) -> str:
+    """Get the uploaded image path for a job"""
+    return os.path.join(JOBS_DIR, f"{job_id}.img")
+
+
+def load_job(job_id: str) -> Optional[dict]:
+    """Load a job's state, or None if it doesn't exist"""
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return None
+    job_file = get_job_file(job_id)
+    try:
+        if os.path.exists(job_file):
+            return read_json_file(job_file, "job")
+    except Exception as e:
+        log_event(logging.ERROR, "Error loading job", job_id=job_id, error=str(e))
+    return None
+
+
+def write_job(job: dict):
+    """Persist a job's state atomically"""
+    job["updated_at"] = datetime.now().isoformat()
+    write_json_file(get_job_file(job["id"]), job, "job")
+
+
+async def save_job(job: dict):
+    """Persist a job's state off the event loop and wake any status listeners"""
+    await asyncio.to_thread(write_job, job)
+    event = job_updates.pop(job["id"], None)
+    if event:
+        event.set()
+
+
+def read_file_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def write_file_bytes(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def job_status_view(job: dict) -> dict:
+    """Public representation of a job for polling/SSE"""
+    return {
+        "job_id": job["id"],
+        "type": job["type"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "attempts": job["attempts"],
+        "results": job["results"],
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+def create_contact_from_job(job: dict) -> dict:
+    """Create the contact for a finished extraction (idempotent per job)"""
+    user_id = job["user_id"]
+    extracted = job["results"]["extracted"]
+    fields = {
+        k: v for k, v in extracted.items()
+        if k in ContactCreate.model_fields and v is not None
+    }
+    if not fields.get("name"):
+        fields["name"] = "Unknown"
+    if job.get("context") and not fields.get("raw_context"):
+        fields["raw_context"] = job["context"]
+
+    with user_lock(user_id):
+        contacts = load_contacts(user_id)
+        # The contact id is fixed when the job is created, so a job resumed after
+        # a crash between saving the contact and checkpointing doesn't duplicate it
+        for contact in contacts:
+            if contact.get("id") == job["contact_id"]:
+                return contact
+
+        new_contact = build_contact_record(ContactCreate(**fields), user_id, job["contact_id"])
+        contacts.append(new_contact)
+        save_contacts(contacts, user_id, changes=[("insert", new_contact["id"])])
+        return new_contact
+
+
+async def run_card_scan_job(job_id: str):
+    """Run a card-scan job unless another worker (in any process) already owns it
+
+    Every worker re-queues unfinished jobs at startup, so the job's .lock
+    file decides which one runs it; the job's status is re-read after the
+    claim in case it finished meanwhile.
+    """
+    claim = try_lock_file(get_job_file(job_id) + ".lock")
+    if claim is None:
+        return
+    try:
+        await resume_card_scan_job(job_id)
+    finally:
+        os.close(claim)
+
+
+async def resume_card_scan_job(job_id: str):
+    """Run the remaining stages of a card-scan job, checkpointing each one"""
+    job = await asyncio.to_thread(load_job, job_id)
+    if not job or job["status"] in ("completed", "failed"):
+        return
+
+    if job["attempts"] >= JOB_MAX_ATTEMPTS:
+        job["status"] = "failed"
+        job["error"] = job.get("error") or "Maximum attempts exceeded"
+        await save_job(job)
+        await asyncio.to_thread(remove_file, get_job_image_file(job_id))
+        return
+
+    job["status"] = "running"
+    job["attempts"] += 1
+    await save_job(job)
+    results = job["results"]
+
+    try:
+        if "card_text" not in results:
+            job["stage"] = "ocr"
+            image_bytes = await asyncio.to_thread(read_file_bytes, get_job_image_file(job_id))
+            results["card_text"] = await asyncio.to_thread(extract_text_from_image, image_bytes)
+            await save_job(job)
+
+        if "extracted" not in results:
+            job["stage"] = "extract"
+            custom_tags, industry = [], None
+            if job["user_id"]:
+                prefs = load_user_preferences(job["user_id"])
+                custom_tags = prefs.get("custom_tags", [])
+                industry = prefs.get("industry")
+            results["extracted"] = await asyncio.to_thread(
+                extract_info_with_ai, job["context"], results["card_text"], custom_tags, industry
+            )
+            await save_job(job)
+
+        if job["create_contact"] and "contact" not in results:
+            job["stage"] = "create_contact"
+            results["contact"] = await asyncio.to_thread(create_contact_from_job, job)
+            await save_job(job)
+
+        job["stage"] = "done"
+        job["status"] = "completed"
+        job["error"] = None
+        await save_job(job)
+    except Exception as e:
+        job["error"] = e.detail if isinstance(e, HTTPException) else str(e)
+        if is_transient_error(e) and job["attempts"] < JOB_MAX_ATTEMPTS:
+            delay = JOB_RETRY_SECONDS * job["attempts"]
+            log_event(
+                logging.WARNING, "Card scan job will be retried", job_id=job_id, stage=job["stage"],
+                attempts=job["attempts"], retry_in_seconds=delay, error=str(e),
+            )
+            job["status"] = "queued"
+            await save_job(job)
+            # Re-queued once this worker has released the job's claim
+            asyncio.get_running_loop().call_later(delay, job_queue.put_nowait, job_id)
+            return
+        log_event(logging.ERROR, "Card scan job failed", job_id=job_id, stage=job["stage"], error=str(e))
+        job["status"] = "failed"
+        await save_job(job)
+
+    await asyncio.to_thread(remove_file, get_job_image_file(job_id))
+
+
+async def job_worker():
+    """Pull job ids off the queue and run them until cancelled"""
+    while True:
+        job_id = await job_queue.get()
+        try:
+            await run_card_scan_job(job_id)
+        except Exception as e:
+            log_event(logging.ERROR, "Job worker error", job_id=job_id, error=str(e))
+        finally:
+            job_queue.task_done()
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Start the job worker pool and re-queue unfinished jobs"""
+    global job_queue
+    job_queue = asyncio.Queue()
+    os.makedirs(JOBS_DIR, exist_ok=True)
+
+    now = datetime.now().timestamp()
+    for name in sorted(os.listdir(JOBS_DIR)):
+        if not name.endswith(".json"):
+            continue
+        job = load_job(name[:-len(".json")])
+        if not job:
+            continue
+        if job["status"] in ("queued", "running"):
+            job_queue.put_nowait(job["id"])
+        elif now - os.path.getmtime(get_job_file(job["id"])) > JOB_RETENTION_SECONDS:
+            os.remove(get_job_file(job["id"]))
+            try:
+                os.remove(get_job_file(job["id"]) + ".lock")
+            except FileNotFoundError:
+                pass
+
+    for _ in range(JOB_WORKERS):
+        job_worker_tasks.append(asyncio.create_task(job_worker()))
+
+
+@app.on_event("startup")
+async def start_change_broker():
+    await change_broker.start()
+
+
+# Event loop monitor
+#
+# Sleeps LOOP_MONITOR_INTERVAL_MS at a time and records how late it wakes up.
+# Any blocking call on the loop (sync file or OpenAI I/O in an async
+# endpoint) shows up as lag; lags over LOOP_STALL_THRESHOLD_MS are counted
+# and logged.
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+LOOP_STALL_THRESHOLD_MS = float(os.getenv("LOOP_STALL_THRESHOLD_MS", "100"))
+loop_monitor_task: Optional[asyncio.Task] = None
+
+
+async def monitor_event_loop():
+    loop = asyncio.get_running_loop()
+    interval = LOOP_MONITOR_INTERVAL_MS / 1000
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        EVENT_LOOP_LAG.observe(lag)
+        if lag * 1000 >= LOOP_STALL_THRESHOLD_MS:
+            EVENT_LOOP_STALLS.inc()
+            log_event(logging.WARNING, "Event loop stalled", lag_ms=round(lag * 1000, 1))
+
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    global loop_monitor_task
+    loop_monitor_task = asyncio.create_task(monitor_event_loop())
+
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    if loop_monitor_task:
+        loop_monitor_task.cancel()
+
+
+# Dependency warm-up
+#
+# With WARMUP_DEPENDENCIES=1, each worker imports the lazily loaded
+# dependencies (openai, PIL, pytesseract, httpx, jwt) and builds the shared
+# clients in a background thread WARMUP_DELAY_SECONDS after startup, so the
+# first scan or transcription doesn't pay for them. The server is already
+# accepting connections by then; requests that arrive earlier import on use.
+WARMUP_DEPENDENCIES = os.getenv("WARMUP_DEPENDENCIES", "0") == "1"
+WARMUP_DELAY_SECONDS = float(os.getenv("WARMUP_DELAY_SECONDS", "1"))
+warmup_task: Optional[asyncio.Task] = None
+
+
+def warm_up_dependencies():
+    start = time.perf_counter()
+    import jwt  # noqa: F401
+    import pytesseract  # noqa: F401
+    from PIL import Image  # noqa: F401
+
+    get_openai_client()
+    get_supabase_http()
+    log_event(logging.INFO, "Dependencies warmed up", duration_ms=round((time.perf_counter() - start) * 1000, 1))
+
+
+async def run_warmup():
+    await asyncio.sleep(WARMUP_DELAY_SECONDS)
+    try:
+        await asyncio.to_thread(warm_up_dependencies)
+    except Exception as e:
+        log_event(logging.WARNING, "Dependency warm-up failed", error=str(e))
+
+
+@app.on_event("startup")
+async def start_warmup():
+    global warmup_task
+    if WARMUP_DEPENDENCIES:
+        warmup_task = asyncio.create_task(run_warmup())
+
+
+@app.on_event("shutdown")
+async def stop_warmup():
+    if warmup_task:
+        warmup_task.cancel()
+
+
+@app.on_event("shutdown")
+async def close_supabase_http():
+    if supabase_http is not None:
+        supabase_http.close()
+
+
+@app.on_event("shutdown")
+async def stop_change_broker():
+    await change_broker.stop()
+
+
+@app.on_event("shutdown")
+async def flush_contact_writes():
+    await contact_writes.drain()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    """Cancel job workers; unfinished jobs resume on next startup"""
+    for task in job_worker_tasks:
+        task.cancel()
+    job_worker_tasks.clear()
+
+
 # API Endpoints
 
 @app.get("/")
@@ -708,6 +4010,64 @@ async def get_current_user(user_id: Optional[str] = Depends(get_user_id_from_tok
     return {"authenticated": True, "user_id": user_id}
 
 
+@app.get("/api/bootstrap")
+async def bootstrap(
+    contacts_limit: int = 0,
+    sort: str = "created",
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
+    """Everything the app needs at launch in one response
+
+    Combines /api/me, /api/preferences, /api/tags and /api/business-card, plus
+    the first page of /api/contacts when contacts_limit > 0. Each per-user file
+    is read once. The per-resource ETags are included so the client can
+    revalidate the individual endpoints later.
+    """
+    if sort not in CONTACT_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(CONTACT_SORTS)}")
+    contacts_limit = max(0, min(contacts_limit, CONTACTS_PAGE_MAX))
+
+    etags = {"tags": get_tags_etag(user_id)}
+    contacts_version = get_resource_version(user_id, "contacts")
+    versions = [contacts_version]
+    if user_id:
+        prefs_version = get_resource_version(user_id, "preferences")
+        card_version = get_resource_version(user_id, "business_card")
+        etags["preferences"] = make_etag("preferences", prefs_version)
+        etags["business_card"] = make_etag("business_card", card_version)
+        versions += [prefs_version, card_version]
+    query_key = zlib.crc32(f"{contacts_limit}|{sort}|{fields}".encode())
+    etag = make_etag("bootstrap", *versions, query_key)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    contacts = load_cached_contacts(user_id, contacts_version)
+    if user_id:
+        prefs = load_user_preferences(user_id)
+        card = load_business_card(user_id)
+    else:
+        prefs = None
+        card = None
+
+    payload = {
+        "user": {"authenticated": bool(user_id), "user_id": user_id},
+        "preferences": prefs or {"industry": None, "custom_tags": [], "suggested_tags": []},
+        "tags": build_tag_list(contacts, prefs),
+        "business_card": card,
+        "contacts": None,
+        "etags": etags,
+    }
+    if contacts_limit:
+        field_set = None
+        if fields:
+            field_set = {f.strip() for f in fields.split(",") if f.strip()} | {"id"}
+        payload["contacts"] = paginate_contacts(contacts, sort, None, contacts_limit, field_set)
+
+    return FastJSONResponse(payload, headers={"ETag": etag})
+
+
 @app.post("/api/migrate-contacts")
 async def migrate_contacts(user_id: Optional[str] = Depends(get_user_id_from_token)):
     """Migrate contacts from shared file to user-specific file"""
@@ -715,41 +4075,39 @@ async def migrate_contacts(user_id: Optional[str] = Depends(get_user_id_from_tok
         raise HTTPException(status_code=401, detail="Authentication required")
 
     # Load contacts from shared/legacy file
-    legacy_file = os.path.join(DATA_DIR, "contacts.json")
-    legacy_contacts = []
-
-    if os.path.exists(legacy_file):
-        try:
-            with open(legacy_file, "r") as f:
-                data = json.load(f)
-                legacy_contacts = data.get("contacts", [])
-        except Exception as e:
-            print(f"Error loading legacy contacts: {e}")
+    # Anonymous contacts live in the shared legacy snapshot and journal
+    legacy_contacts = await asyncio.to_thread(load_contacts, None)
 
     if not legacy_contacts:
         return {"success": True, "message": "No contacts to migrate", "migrated": 0}
 
-    # Load existing user contacts
-    user_contacts = load_contacts(user_id)
+    def migrate():
+        with user_lock(user_id):
+            # Load existing user contacts
+            user_contacts = load_contacts(user_id)
+
+            # Get existing contact IDs to avoid duplicates
+            existing_ids = {c.get("id") for c in user_contacts}
 
-    # Get existing contact IDs to avoid duplicates
-    existing_ids = {c.get("id") for c in user_contacts}
+            # Migrate contacts that don't already exist
+            migrated = []
+            for contact in legacy_contacts:
+                if contact.get("id") not in existing_ids:
+                    contact["user_id"] = user_id
+                    user_contacts.append(contact)
+                    migrated.append(("insert", contact.get("id")))
 
-    # Migrate contacts that don't already exist
-    migrated = 0
-    for contact in legacy_contacts:
-        if contact.get("id") not in existing_ids:
-            contact["user_id"] = user_id
-            user_contacts.append(contact)
-            migrated += 1
+            # Save to user file
+            save_contacts(user_contacts, user_id, changes=migrated)
+        return user_contacts, migrated
 
-    # Save to user file
-    save_contacts(user_contacts, user_id)
+    # The lock may be held by another worker; wait for it off the event loop
+    user_contacts, migrated = await asyncio.to_thread(migrate)
 
     return {
         "success": True,
-        "message": f"Migrated {migrated} contacts to your account",
-        "migrated": migrated,
+        "message": f"Migrated {len(migrated)} contacts to your account",
+        "migrated": len(migrated),
         "total_contacts": len(user_contacts)
     }
 
@@ -759,21 +4117,53 @@ async def get_contacts(
     industry: Optional[str] = None,
     location: Optional[str] = None,
     limit: Optional[int] = None,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     user_id: Optional[str] = Depends(get_user_id_from_token)
 ):
-    """Get all contacts with optional filters (per-user)"""
-    contacts = load_contacts(user_id)
+    """Get all contacts with optional filters (per-user)
+
+    sort=created|priority switches to cursor pagination: pages of `limit`
+    contacts plus a next_cursor to pass back as `cursor`. fields=a,b,c
+    returns only those fields (id is always included).
+    """
+    query_key = zlib.crc32(f"{industry}|{location}|{limit}|{sort}|{cursor}|{fields}".encode())
+    contacts_version = get_resource_version(user_id, "contacts")
+    etag = make_etag("contacts", contacts_version, query_key)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    if cursor and not sort:
+        sort = "created"
+    if sort and sort not in CONTACT_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(CONTACT_SORTS)}")
+    field_set = None
+    if fields:
+        field_set = {f.strip() for f in fields.split(",") if f.strip()} | {"id"}
+    after = decode_cursor(cursor, sort) if cursor else None
+
+    contacts = load_cached_contacts(user_id, contacts_version)
 
     if industry:
-        contacts = [c for c in contacts if c.get("industry", "").lower() == industry.lower()]
+        contacts = [c for c in contacts if (c.get("industry") or "").lower() == industry.lower()]
 
     if location:
-        contacts = [c for c in contacts if c.get("location", "").lower() == location.lower()]
-
-    if limit:
-        contacts = contacts[:limit]
+        contacts = [c for c in contacts if (c.get("location") or "").lower() == location.lower()]
+
+    if not sort:
+        if limit:
+            contacts = contacts[:limit]
+        return FastJSONResponse(
+            {"contacts": [project_contact(c, field_set) for c in contacts]},
+            headers={"ETag": etag},
+        )
 
-    return {"contacts": contacts}
+    return FastJSONResponse(
+        paginate_contacts(contacts, sort, after, limit, field_set),
+        headers={"ETag": etag},
+    )
 
 
 @app.post("/api/contacts")
@@ -782,33 +4172,333 @@ async def create_contact(
     user_id: Optional[str] = Depends(get_user_id_from_token)
 ):
     """Create a new contact (per-user)"""
-    contacts = load_contacts(user_id)
+    new_contact = build_contact_record(contact, user_id)
 
-    new_contact = contact.model_dump()
-    new_contact["id"] = str(uuid.uuid4())
-    new_contact["user_id"] = user_id  # Store user_id with contact
-    new_contact["created_at"] = datetime.now().isoformat()
-    new_contact["updated_at"] = datetime.now().isoformat()
-
-    contacts.append(new_contact)
-    save_contacts(contacts, user_id)
+    def insert(by_id: dict):
+        by_id[new_contact["id"]] = new_contact
+        return new_contact, [("insert", new_contact["id"])]
 
+    await contact_writes.submit(user_id, insert)
     return {"success": True, "contact": new_contact}
 
 
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "1000"))
+
+
+def apply_contact_operations(
+    contacts: List[dict],
+    operations: List[BatchOperation],
+    user_id: Optional[str],
+    atomic: bool
+) -> tuple:
+    """Apply batch operations to a loaded contact list in memory
+
+    Returns (contacts, results, changes). In atomic mode the original list is
+    returned untouched with no changes if any operation fails, and the
+    operations that did succeed are reported as rolled back.
+    """
+    # Keyed by id (insertion ordered) so updates and deletes are O(1)
+    by_id = contacts_by_id(contacts)
+    results = []
+    changes = []
+    now = datetime.now().isoformat()
+
+    for index, operation in enumerate(operations):
+        result = {"index": index, "op": operation.op, "id": operation.id, "success": False}
+        results.append(result)
+        try:
+            if operation.op == "create":
+                new_contact = build_contact_record(ContactCreate(**(operation.contact or {})), user_id, operation.id)
+                if new_contact["id"] in by_id:
+                    result.update(status=409, error="Contact already exists")
+                    continue
+                by_id[new_contact["id"]] = new_contact
+                changes.append(("insert", new_contact["id"]))
+                result.update(success=True, status=201, id=new_contact["id"], contact=new_contact)
+            elif operation.op in ("update", "delete"):
+                if not operation.id:
+                    result.update(status=400, error="id is required")
+                elif operation.id not in by_id:
+                    result.update(status=404, error="Contact not found")
+                elif operation.op == "update":
+                    updates = ContactUpdate(**(operation.contact or {})).model_dump(exclude_unset=True)
+                    updated = {**by_id[operation.id], **updates, "updated_at": now}
+                    by_id[operation.id] = updated
+                    changes.append(("update", operation.id))
+                    result.update(success=True, status=200, contact=updated)
+                else:
+                    del by_id[operation.id]
+                    changes.append(("delete", operation.id))
+                    result.update(success=True, status=200)
+            else:
+                result.update(status=400, error=f"Unknown op '{operation.op}'")
+        except ValidationError as e:
+            result.update(status=422, error=str(e))
+
+    if atomic and not all(r["success"] for r in results):
+        for result in results:
+            if result["success"]:
+                # Nothing was saved, so drop the contact (and any generated id) from the result
+                result.pop("contact", None)
+                result.update(
+                    id=operations[result["index"]].id, success=False, status=424, error="Batch rolled back"
+                )
+        return contacts, results, []
+    return list(by_id.values()), results, changes
+
+
+@app.post("/api/contacts/batch")
+async def batch_contacts(
+    request: BatchRequest,
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
+    """Apply many create/update/delete operations with one load and one save
+
+    With atomic=true (default) nothing is written unless every operation
+    succeeds; with atomic=false valid operations are applied and failures
+    are reported per operation.
+    """
+    if len(request.operations) > BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many operations (max {BATCH_MAX_OPERATIONS})"
+        )
+
+    def apply():
+        with user_lock(user_id):
+            contacts = load_contacts(user_id)
+            contacts, results, changes = apply_contact_operations(
+                contacts, request.operations, user_id, request.atomic
+            )
+            if changes:
+                save_contacts(contacts, user_id, changes=changes)
+        return results, changes
+
+    results, changes = await asyncio.to_thread(apply)
+    applied = len(changes)
+    if request.atomic and applied == 0 and request.operations:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Batch rejected, no operations applied", "results": results}
+        )
+    return {"success": applied == len(request.operations), "applied": applied, "results": results}
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "vcf": "text/vcard",
+}
+
+
+@app.get("/api/contacts/export")
+async def export_contacts_endpoint(
+    format: str = "ndjson",
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
+    """Stream all of the user's contacts as NDJSON, CSV or vCard"""
+    from fastapi.responses import StreamingResponse
+
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be one of ndjson, csv, vcf")
+
+    return StreamingResponse(
+        export_contacts(user_id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=contacts.{format}"}
+    )
+
+
+@app.post("/api/contacts/import")
+async def import_contacts_endpoint(
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None),
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
+    """Import a .vcf or .csv address book, skipping duplicates by email/phone
+
+    The response is NDJSON: a "progress" line after each committed batch and
+    a final "done" line with the totals.
+    """
+    from fastapi.responses import StreamingResponse
+    from starlette.background import BackgroundTask
+
+    import_format = format
+    if not import_format:
+        ext = os.path.splitext(file.filename or "")[1].lower()
+        import_format = {".vcf": "vcf", ".vcard": "vcf", ".csv": "csv"}.get(ext)
+    if import_format not in ("vcf", "csv"):
+        raise HTTPException(status_code=400, detail="Upload a .vcf or .csv file (or pass format=vcf|csv)")
+
+    # The upload is closed once this handler returns, so keep our own copy
+    temp_dir = tempfile.mkdtemp(prefix="reachr-import-")
+    try:
+        path = await spool_upload(file, temp_dir, IMPORT_MAX_BYTES)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    def import_stream():
+        try:
+            progress = {}
+            with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as text_stream:
+                for progress in import_contacts(user_id, text_stream, import_format):
+                    yield json.dumps({"type": "progress", **progress}) + "\n"
+            yield json.dumps({"type": "done", "success": True, **progress}) + "\n"
+        except Exception as e:
+            log_event(logging.ERROR, "Contact import failed", user_id=user_id, error=str(e))
+            yield json.dumps({"type": "done", "success": False, "error": str(e)}) + "\n"
+
+    # Runs after the response even if the client disconnects before the body starts
+    return StreamingResponse(
+        import_stream(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(shutil.rmtree, temp_dir, ignore_errors=True),
+    )
+
+
+@app.get("/api/contacts/changes")
+async def get_contact_changes(
+    since: int = 0,
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
+    """Contact inserts, updates and deletes after a change sequence (delta sync)
+
+    Only the latest change per contact is returned. When the log no longer
+    reaches back to `since`, full_resync is true and the client should
+    re-download GET /api/contacts and continue from the returned seq.
+    """
+    log = load_change_log(user_id)
+    if since < log["truncated_seq"] or since > log["seq"]:
+        return {"seq": log["seq"], "full_resync": True, "changes": []}
+
+    latest = {}
+    inserted = set()
+    for entry in log["changes"]:
+        if entry["seq"] <= since:
+            continue
+        if entry["op"] == "insert":
+            inserted.add(entry["id"])
+        latest[entry["id"]] = entry
+
+    pending = sorted(latest.values(), key=lambda e: e["seq"])
+    contacts_by_id = {}
+    if any(e["op"] != "delete" for e in pending):
+        contacts_by_id = {c.get("id"): c for c in load_contacts(user_id)}
+
+    changes = []
+    for entry in pending:
+        op = entry["op"]
+        if op == "delete":
+            if entry["id"] in inserted:
+                # Created and deleted since the client's seq - never seen by it
+                continue
+            changes.append({"seq": entry["seq"], "op": "delete", "id": entry["id"]})
+            continue
+        contact = contacts_by_id.get(entry["id"])
+        if contact is None:
+            continue
+        if entry["id"] in inserted:
+            op = "insert"
+        changes.append({"seq": entry["seq"], "op": op, "id": entry["id"], "contact": contact})
+
+    return {"seq": log["seq"], "full_resync": False, "changes": changes}
+
+
+@app.get("/api/changes/events")
+async def stream_changes(user_id: Optional[str] = Depends(get_user_id_from_token)):
+    """Stream the user's contact, preference and business-card changes as Server-Sent Events
+
+    The first event ("ready") carries the current change-log seq. A "resync"
+    event means this connection fell too far behind and was dropped; the
+    client should catch up with GET /api/contacts/changes and reconnect.
+    """
+    from fastapi.responses import StreamingResponse
+
+    async def event_stream():
+        sub = change_broker.subscribe(user_id)
+        try:
+            # Subscribed before reading seq, so no change falls in between
+            seq = (await asyncio.to_thread(load_change_log, user_id))["seq"]
+            yield f"event: ready\ndata: {json.dumps({'seq': seq})}\n\n"
+            while True:
+                if sub.overflowed:
+                    yield "event: resync\ndata: {}\n\n"
+                    break
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            change_broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.get("/api/contacts/duplicates")
+async def get_duplicate_contacts(user_id: Optional[str] = Depends(get_user_id_from_token)):
+    """Find groups of likely duplicate contacts (same email, phone, or name + company)"""
+    contacts = load_cached_contacts(user_id)
+    groups = find_duplicate_groups(contacts)
+    return {"groups": groups, "count": len(groups)}
+
+
+@app.post("/api/contacts/merge")
+async def merge_contacts(
+    request: MergeRequest,
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
+    """Merge duplicate contacts into one and delete the rest"""
+    contact_ids = list(dict.fromkeys(request.contact_ids))
+    if len(contact_ids) < 2:
+        raise HTTPException(status_code=400, detail="At least two contact ids are required")
+    if request.primary_id and request.primary_id not in contact_ids:
+        raise HTTPException(status_code=400, detail="primary_id must be one of contact_ids")
+
+    def merge():
+        with user_lock(user_id):
+            contacts = load_contacts(user_id)
+            by_id = {c.get("id"): c for c in contacts}
+            missing = [cid for cid in contact_ids if cid not in by_id]
+            if missing:
+                raise HTTPException(status_code=404, detail=f"Contacts not found: {', '.join(missing)}")
+
+            records = [by_id[cid] for cid in contact_ids]
+            # Default to the oldest contact's id so existing links keep working
+            primary_id = request.primary_id or min(
+                records, key=lambda c: c.get("created_at") or ""
+            )["id"]
+            merged = merge_contact_records(records, primary_id)
+
+            removed = set(contact_ids) - {primary_id}
+            contacts = [
+                merged if c.get("id") == primary_id else c
+                for c in contacts if c.get("id") not in removed
+            ]
+            changes = [("update", primary_id)] + [("delete", cid) for cid in contact_ids if cid in removed]
+            save_contacts(contacts, user_id, changes=changes)
+        return merged, removed
+
+    merged, removed = await asyncio.to_thread(merge)
+    return {"success": True, "contact": merged, "merged_ids": sorted(removed)}
+
+
 @app.get("/api/contacts/{contact_id}")
 async def get_contact(
     contact_id: str,
     user_id: Optional[str] = Depends(get_user_id_from_token)
 ):
     """Get a single contact by ID (per-user)"""
-    contacts = load_contacts(user_id)
-
-    for contact in contacts:
-        if contact.get("id") == contact_id:
-            return {"contact": contact}
-
-    raise HTTPException(status_code=404, detail="Contact not found")
+    contact = load_cached_contacts(user_id).find(contact_id)
+    if contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return {"contact": contact.to_dict()}
 
 
 @app.put("/api/contacts/{contact_id}")
@@ -818,17 +4508,16 @@ async def update_contact(
     user_id: Optional[str] = Depends(get_user_id_from_token)
 ):
     """Update a contact (per-user)"""
-    contacts = load_contacts(user_id)
-
-    for i, contact in enumerate(contacts):
-        if contact.get("id") == contact_id:
-            updated = {**contact, **updates.model_dump(exclude_unset=True)}
-            updated["updated_at"] = datetime.now().isoformat()
-            contacts[i] = updated
-            save_contacts(contacts, user_id)
-            return {"success": True, "contact": updated}
+    def update(by_id: dict):
+        if contact_id not in by_id:
+            raise HTTPException(status_code=404, detail="Contact not found")
+        updated = {**by_id[contact_id], **updates.model_dump(exclude_unset=True)}
+        updated["updated_at"] = datetime.now().isoformat()
+        by_id[contact_id] = updated
+        return updated, [("update", contact_id)]
 
-    raise HTTPException(status_code=404, detail="Contact not found")
+    updated = await contact_writes.submit(user_id, update)
+    return {"success": True, "contact": updated}
 
 
 @app.delete("/api/contacts/{contact_id}")
@@ -837,15 +4526,14 @@ async def delete_contact(
     user_id: Optional[str] = Depends(get_user_id_from_token)
 ):
     """Delete a contact (per-user)"""
-    contacts = load_contacts(user_id)
-
-    for i, contact in enumerate(contacts):
-        if contact.get("id") == contact_id:
-            contacts.pop(i)
-            save_contacts(contacts, user_id)
-            return {"success": True}
+    def delete(by_id: dict):
+        if contact_id not in by_id:
+            raise HTTPException(status_code=404, detail="Contact not found")
+        del by_id[contact_id]
+        return None, [("delete", contact_id)]
 
-    raise HTTPException(status_code=404, detail="Contact not found")
+    await contact_writes.submit(user_id, delete)
+    return {"success": True}
 
 
 @app.post("/api/search")
@@ -854,16 +4542,16 @@ async def search(
     user_id: Optional[str] = Depends(get_user_id_from_token)
 ):
     """Search contacts (per-user)"""
-    contacts = load_contacts(user_id)
+    contacts = load_cached_contacts(user_id)
     results = search_contacts(request.query, contacts)
 
     top_score = results[0]["score"] if results else 0
 
-    return {
+    return FastJSONResponse({
         "results": results,
         "topScore": top_score,
         "query": request.query
-    }
+    })
 
 
 @app.post("/api/ocr")
@@ -878,37 +4566,99 @@ async def extract_card_text(image: UploadFile = File(...)):
 
 
 @app.post("/api/extract")
-async def extract_tags(request: ExtractRequest):
+async def extract_tags(
+    request: ExtractRequest,
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
     """Extract structured info and tags from context"""
-    result = extract_info_with_ai(request.context, request.cardText)
+    custom_tags, industry = [], None
+    if user_id:
+        prefs = load_user_preferences(user_id)
+        custom_tags = prefs.get("custom_tags", [])
+        industry = prefs.get("industry")
+    result = extract_info_with_ai(request.context, request.cardText, custom_tags, industry)
     return result
 
 
+@app.get("/api/extract/stats")
+async def get_extract_stats():
+    """Report how many extractions were served locally vs. by the LLM"""
+    stats = get_extraction_stats()
+    total = stats["local"] + stats["llm"]
+    return {
+        "total": total,
+        "local": stats["local"],
+        "llm": stats["llm"],
+        "local_fraction": round(stats["local"] / total, 4) if total else 0.0,
+        "threshold": LOCAL_EXTRACT_THRESHOLD,
+    }
+
+
 @app.post("/api/transcribe")
-async def transcribe_audio(audio: UploadFile = File(...)):
-    """Transcribe audio file (placeholder - uses OpenAI Whisper)"""
-    if not openai_client:
+async def transcribe_audio(audio: UploadFile = File(...), stream: bool = False):
+    """Transcribe audio file with OpenAI Whisper
+
+    Long recordings are transcribed in overlapping segments. With
+    ?stream=true the response is NDJSON: one "partial" line per segment
+    followed by a "final" line with the stitched transcript.
+    """
+    if not OPENAI_API_KEY:
         return {"text": "", "success": False, "error": "OpenAI API key not configured"}
 
+    temp_dir = tempfile.mkdtemp(prefix="reachr-audio-")
     try:
-        contents = await audio.read()
+        path = await spool_upload(audio, temp_dir, TRANSCRIBE_MAX_BYTES)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    if stream:
+        from fastapi.responses import StreamingResponse
+        from starlette.background import BackgroundTask
+
+        async def transcript_stream():
+            text = ""
+            try:
+                async for index, segment_text in transcribe_segments(path, temp_dir):
+                    piece = stitch_transcripts(text, segment_text) if text else segment_text
+                    text = f"{text} {piece}".strip()
+                    yield json.dumps({"type": "partial", "index": index, "text": piece}) + "\n"
+                yield json.dumps({"type": "final", "text": text, "success": True}) + "\n"
+            except Exception as e:
+                error = e.detail if isinstance(e, HTTPException) else str(e)
+                yield json.dumps({"type": "final", "text": text, "success": False, "error": error}) + "\n"
+
+        # Runs after the response even if the client disconnects before the body starts
+        return StreamingResponse(
+            transcript_stream(),
+            media_type="application/x-ndjson",
+            background=BackgroundTask(shutil.rmtree, temp_dir, ignore_errors=True),
+        )
 
-        # Save temp file for OpenAI
-        temp_path = f"/tmp/{audio.filename}"
-        with open(temp_path, "wb") as f:
-            f.write(contents)
+    try:
+        text = await transcribe_path(path, temp_dir)
+        return {"text": text, "success": True}
+    except HTTPException:
+        raise
+    except Exception as e:
+        return {"text": "", "success": False, "error": str(e)}
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
 
-        with open(temp_path, "rb") as f:
-            transcript = openai_client.audio.transcriptions.create(
-                model="whisper-1",
-                file=f
-            )
 
-        os.remove(temp_path)
+def build_voice_search_response(query: str, contacts: List[dict]) -> dict:
+    """Run a voice query against contacts and shape the voice-search payload"""
+    results = search_contacts(query, contacts)
 
-        return {"text": transcript.text, "success": True}
-    except Exception as e:
-        return {"text": "", "success": False, "error": str(e)}
+    # Return contacts from results
+    contact_list = [dict(r["contact"]) for r in results[:10]]
+
+    return {
+        "success": True,
+        "results": contact_list,
+        "explanation": f"Found {len(contact_list)} contacts matching '{query}'",
+        "source": "simple"
+    }
 
 
 @app.post("/api/voice-search")
@@ -917,26 +4667,154 @@ async def voice_search(
     user_id: Optional[str] = Depends(get_user_id_from_token)
 ):
     """Search contacts using voice query (per-user)"""
-    contacts = load_contacts(user_id)
-    results = search_contacts(request.query, contacts)
+    contacts = load_cached_contacts(user_id)
+    return build_voice_search_response(request.query, contacts)
 
-    # Return contacts from results
-    contact_list = [r["contact"] for r in results[:10]]
 
-    return {
-        "success": True,
-        "results": contact_list,
-        "explanation": f"Found {len(contact_list)} contacts matching '{request.query}'",
-        "source": "simple"
-    }
+@app.post("/api/voice-search/audio")
+async def voice_search_audio(
+    audio: UploadFile = File(...),
+    stream: bool = False,
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
+    """Transcribe a voice query and search contacts in one round trip
+
+    The user's contacts are loaded while Whisper runs. With ?stream=true the
+    response is NDJSON: a "transcript" line first, then a "results" line.
+    """
+    if not OPENAI_API_KEY:
+        return {"transcript": "", "success": False, "results": [], "error": "OpenAI API key not configured"}
+
+    temp_dir = tempfile.mkdtemp(prefix="reachr-audio-")
+    try:
+        path = await spool_upload(audio, temp_dir, TRANSCRIBE_MAX_BYTES)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    # Warm the contact list concurrently with transcription
+    contacts_task = asyncio.create_task(asyncio.to_thread(load_cached_contacts, user_id))
+
+    if stream:
+        from fastapi.responses import StreamingResponse
+        from starlette.background import BackgroundTask
+
+        def cleanup():
+            contacts_task.cancel()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        async def voice_search_stream():
+            try:
+                transcript = await transcribe_path(path, temp_dir)
+                yield json.dumps({"type": "transcript", "text": transcript}) + "\n"
+                response = build_voice_search_response(transcript, await contacts_task)
+                yield json.dumps({"type": "results", **response}, default=str) + "\n"
+            except Exception as e:
+                error = e.detail if isinstance(e, HTTPException) else str(e)
+                yield json.dumps({"type": "error", "success": False, "error": error}) + "\n"
+
+        # Runs after the response even if the client disconnects before the body starts
+        return StreamingResponse(
+            voice_search_stream(), media_type="application/x-ndjson", background=BackgroundTask(cleanup)
+        )
+
+    try:
+        transcript = await transcribe_path(path, temp_dir)
+        response = build_voice_search_response(transcript, await contacts_task)
+        return {"transcript": transcript, **response}
+    except HTTPException:
+        raise
+    except Exception as e:
+        return {"transcript": "", "success": False, "results": [], "error": str(e)}
+    finally:
+        contacts_task.cancel()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+BREAKER_STATES = ("closed", "open", "half_open")
+GaugeCallback(
+    "circuit_breaker_state", "1 for the breaker's current state", ("breaker", "state"),
+    lambda: [((b.name, st), int(b.state == st)) for b in openai_breakers.values() for st in BREAKER_STATES],
+)
+GaugeCallback(
+    "circuit_breaker_calls", "Breaker call outcomes since startup", ("breaker", "result"),
+    lambda: [((b.name, k), v) for b in openai_breakers.values() for k, v in dict(b.counters).items()],
+)
+GaugeCallback(
+    "extractions", "Extractions by path since startup", ("path",),
+    lambda: [((k,), v) for k, v in get_extraction_stats().items()],
+)
+GaugeCallback(
+    "job_queue_depth", "Jobs waiting for a worker", (),
+    lambda: [((), job_queue.qsize() if job_queue is not None else 0)],
+)
+GaugeCallback(
+    "contact_cache_contacts", "Contacts held in the contact cache", (),
+    lambda: [((), contact_cache.size)],
+)
+GaugeCallback(
+    "change_feed_subscribers", "Open change feed connections in this process", (),
+    lambda: [((), sum(len(subs) for subs in change_broker.subscriptions.values()))],
+)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text-format metrics"""
+    from fastapi.responses import PlainTextResponse
+
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/metrics/breakers")
+async def get_breaker_metrics():
+    """Circuit breaker state and transition counters for OpenAI calls"""
+    return {"breakers": {name: b.snapshot() for name, b in openai_breakers.items()}}
+
+
+@app.get("/api/admin/profiles")
+async def list_profiles(_: None = Depends(require_admin)):
+    """Stored request profiles, newest first"""
+    if not os.path.isdir(PROFILES_DIR):
+        return {"profiles": []}
+    profiles = []
+    for name in sorted(os.listdir(PROFILES_DIR), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PROFILES_DIR, name), "r") as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # rotated out while listing
+    return {"profiles": profiles}
+
+
+@app.get("/api/admin/profiles/{profile_id}")
+async def download_profile(profile_id: str, _: None = Depends(require_admin)):
+    """Download a profile as collapsed stacks (flamegraph.pl / speedscope input)"""
+    from fastapi.responses import FileResponse
+
+    path = os.path.join(PROFILES_DIR, f"{profile_id}.folded")
+    if not PROFILE_ID_RE.match(profile_id) or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
 
 
 @app.get("/api/preferences")
-async def get_preferences(user_id: Optional[str] = Depends(get_user_id_from_token)):
+async def get_preferences(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
     """Get user preferences"""
     if not user_id:
         return {"industry": None, "custom_tags": [], "suggested_tags": []}
 
+    etag = make_etag("preferences", get_resource_version(user_id, "preferences"))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     prefs = load_user_preferences(user_id)
     return prefs
 
@@ -950,33 +4828,38 @@ async def update_preferences(
     if not user_id:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    current_prefs = load_user_preferences(user_id)
+    def update():
+        with user_lock(user_id):
+            current_prefs = load_user_preferences(user_id)
 
-    # Update with new values
-    if preferences.industry is not None:
-        current_prefs["industry"] = preferences.industry
-        # Set suggested tags based on industry
-        industry_key = preferences.industry.lower().replace(" ", "_")
-        current_prefs["suggested_tags"] = INDUSTRY_DEFAULT_TAGS.get(
-            industry_key, INDUSTRY_DEFAULT_TAGS.get("general", [])
-        )
+            # Update with new values
+            if preferences.industry is not None:
+                current_prefs["industry"] = preferences.industry
+                # Set suggested tags based on industry
+                industry_key = preferences.industry.lower().replace(" ", "_")
+                current_prefs["suggested_tags"] = INDUSTRY_DEFAULT_TAGS.get(
+                    industry_key, INDUSTRY_DEFAULT_TAGS.get("general", [])
+                )
+
+            if preferences.custom_tags is not None:
+                current_prefs["custom_tags"] = preferences.custom_tags
 
-    if preferences.custom_tags is not None:
-        current_prefs["custom_tags"] = preferences.custom_tags
+            save_user_preferences(user_id, current_prefs)
+        return current_prefs
 
-    save_user_preferences(user_id, current_prefs)
+    current_prefs = await asyncio.to_thread(update)
     return {"success": True, "preferences": current_prefs}
 
 
-@app.get("/api/tags")
-async def get_all_tags(user_id: Optional[str] = Depends(get_user_id_from_token)):
-    """Get all tags for autocomplete - combines custom, contact-derived, and industry defaults"""
+def build_tag_list(contacts: List[dict], prefs: Optional[dict]) -> List[dict]:
+    """Combine custom, suggested, contact-derived and default tags with counts
+
+    prefs is None for anonymous users.
+    """
     all_tags = {}
 
     # 1. Get industry default tags if user is logged in
-    if user_id:
-        prefs = load_user_preferences(user_id)
-
+    if prefs is not None:
         # Add custom tags (highest priority)
         for tag in prefs.get("custom_tags", []):
             tag_lower = tag.lower()
@@ -990,32 +4873,48 @@ async def get_all_tags(user_id: Optional[str] = Depends(get_user_id_from_token))
                 all_tags[tag_lower] = {"tag": tag_lower, "count": 0, "source": "suggested"}
 
     # 2. Get tags from contacts
-    contacts = load_contacts(user_id)
-    for contact in contacts:
-        if contact.get("tags"):
-            for tag in contact["tags"]:
-                tag_lower = tag.lower()
-                if tag_lower in all_tags:
-                    all_tags[tag_lower]["count"] += 1
-                else:
-                    all_tags[tag_lower] = {"tag": tag_lower, "count": 1, "source": "contact"}
+    for tag, count in count_contact_tags(contacts).items():
+        tag_lower = tag.lower()
+        if tag_lower in all_tags:
+            all_tags[tag_lower]["count"] += count
+        else:
+            all_tags[tag_lower] = {"tag": tag_lower, "count": count, "source": "contact"}
 
     # 3. Add general default tags if user has no preferences set
-    if user_id:
-        prefs = load_user_preferences(user_id)
-        if not prefs.get("industry") and not prefs.get("suggested_tags"):
-            for tag in INDUSTRY_DEFAULT_TAGS.get("general", []):
-                tag_lower = tag.lower()
-                if tag_lower not in all_tags:
-                    all_tags[tag_lower] = {"tag": tag_lower, "count": 0, "source": "default"}
+    if prefs is not None and not prefs.get("industry") and not prefs.get("suggested_tags"):
+        for tag in INDUSTRY_DEFAULT_TAGS.get("general", []):
+            tag_lower = tag.lower()
+            if tag_lower not in all_tags:
+                all_tags[tag_lower] = {"tag": tag_lower, "count": 0, "source": "default"}
 
     # Sort by count (desc) then alphabetically
-    sorted_tags = sorted(
+    return sorted(
         all_tags.values(),
         key=lambda x: (-x["count"], x["tag"])
     )
 
-    return {"tags": sorted_tags}
+
+def get_tags_etag(user_id: Optional[str]) -> str:
+    # Tags are derived from contacts and preferences, so both versions count
+    versions = [get_resource_version(user_id, "contacts")]
+    if user_id:
+        versions.append(get_resource_version(user_id, "preferences"))
+    return make_etag("tags", *versions)
+
+
+@app.get("/api/tags")
+async def get_all_tags(
+    if_none_match: Optional[str] = Header(None),
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
+    """Get all tags for autocomplete - combines custom, contact-derived, and industry defaults"""
+    etag = get_tags_etag(user_id)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    prefs = load_user_preferences(user_id) if user_id else None
+    sorted_tags = build_tag_list(load_cached_contacts(user_id), prefs)
+    return FastJSONResponse({"tags": sorted_tags}, headers={"ETag": etag})
 
 
 @app.get("/api/industries")
@@ -1072,14 +4971,18 @@ async def add_custom_tag(
     if not tag_name:
         raise HTTPException(status_code=400, detail="Tag name is required")
 
-    prefs = load_user_preferences(user_id)
-    custom_tags = prefs.get("custom_tags", [])
+    def add():
+        with user_lock(user_id):
+            prefs = load_user_preferences(user_id)
+            custom_tags = prefs.get("custom_tags", [])
 
-    if tag_name not in [t.lower() for t in custom_tags]:
-        custom_tags.append(tag_name)
-        prefs["custom_tags"] = custom_tags
-        save_user_preferences(user_id, prefs)
+            if tag_name not in [t.lower() for t in custom_tags]:
+                custom_tags.append(tag_name)
+                prefs["custom_tags"] = custom_tags
+                save_user_preferences(user_id, prefs)
+        return custom_tags
 
+    custom_tags = await asyncio.to_thread(add)
     return {"success": True, "custom_tags": custom_tags}
 
 
@@ -1092,25 +4995,129 @@ async def delete_custom_tag(
     if not user_id:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    prefs = load_user_preferences(user_id)
-    custom_tags = prefs.get("custom_tags", [])
+    def remove():
+        with user_lock(user_id):
+            prefs = load_user_preferences(user_id)
+            custom_tags = prefs.get("custom_tags", [])
 
-    # Remove tag (case-insensitive)
-    custom_tags = [t for t in custom_tags if t.lower() != tag_name.lower()]
-    prefs["custom_tags"] = custom_tags
-    save_user_preferences(user_id, prefs)
+            # Remove tag (case-insensitive)
+            custom_tags = [t for t in custom_tags if t.lower() != tag_name.lower()]
+            prefs["custom_tags"] = custom_tags
+            save_user_preferences(user_id, prefs)
+        return custom_tags
 
+    custom_tags = await asyncio.to_thread(remove)
     return {"success": True, "custom_tags": custom_tags}
 
 
+# Job Endpoints
+
+@app.post("/api/jobs/card-scan", status_code=202)
+async def create_card_scan_job(
+    image: UploadFile = File(...),
+    context: str = Form(""),
+    create_contact: bool = Form(True),
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
+    """Queue a scan -> OCR -> extract -> create contact job and return its id"""
+    job_id = str(uuid.uuid4())
+    contents = await image.read()
+    ensure_dir(JOBS_DIR)
+    await asyncio.to_thread(write_file_bytes, get_job_image_file(job_id), contents)
+
+    now = datetime.now().isoformat()
+    job = {
+        "id": job_id,
+        "type": "card-scan",
+        "user_id": user_id,
+        "context": context,
+        "create_contact": create_contact,
+        "contact_id": str(uuid.uuid4()),
+        "status": "queued",
+        "stage": "ocr",
+        "attempts": 0,
+        "results": {},
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    await save_job(job)
+    await job_queue.put(job_id)
+
+    return {"success": True, "job_id": job_id, "status": "queued"}
+
+
+def get_user_job(job_id: str, user_id: Optional[str]) -> dict:
+    """Load a job owned by the current user or raise 404"""
+    job = load_job(job_id)
+    if not job or job.get("user_id") != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(
+    job_id: str,
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
+    """Poll the status of a background job"""
+    job = await asyncio.to_thread(get_user_job, job_id, user_id)
+    return job_status_view(job)
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_status(
+    job_id: str,
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
+    """Stream job status changes as Server-Sent Events until the job finishes"""
+    from fastapi.responses import StreamingResponse
+
+    await asyncio.to_thread(get_user_job, job_id, user_id)
+
+    async def event_stream():
+        last_payload = None
+        while True:
+            # Register for the next update before reading, so none is missed
+            update = job_updates.setdefault(job_id, asyncio.Event())
+            job = await asyncio.to_thread(load_job, job_id)
+            if not job:
+                break
+            payload = job_status_view(job)
+            if payload != last_payload:
+                yield f"event: status\ndata: {json.dumps(payload)}\n\n"
+                last_payload = payload
+            if job["status"] in ("completed", "failed"):
+                break
+            try:
+                await asyncio.wait_for(update.wait(), timeout=15)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
 # Business Card Endpoints
 
 @app.get("/api/business-card")
-async def get_business_card(user_id: Optional[str] = Depends(get_user_id_from_token)):
+async def get_business_card(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    user_id: Optional[str] = Depends(get_user_id_from_token)
+):
     """Get the current user's business card"""
     if not user_id:
         raise HTTPException(status_code=401, detail="Authentication required")
 
+    etag = make_etag("business_card", get_resource_version(user_id, "business_card"))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     card = load_business_card(user_id)
     return {"card": card}
 
@@ -1124,25 +5131,29 @@ async def save_business_card_endpoint(
     if not user_id:
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    # Load existing card or create new
-    existing_card = load_business_card(user_id)
-
-    if existing_card:
-        # Update existing card
-        card = existing_card
-        card.update(card_input.model_dump(exclude_unset=True))
-        card["updated_at"] = datetime.now().isoformat()
-    else:
-        # Create new card
-        card = card_input.model_dump()
-        card["id"] = str(uuid.uuid4())
-        card["user_id"] = user_id
-        card["share_slug"] = generate_share_slug(card_input.full_name)
-        card["created_at"] = datetime.now().isoformat()
-        card["updated_at"] = datetime.now().isoformat()
-
-    save_business_card(user_id, card)
+    def save():
+        with user_lock(user_id):
+            # Load existing card or create new
+            existing_card = load_business_card(user_id)
 
+            if existing_card:
+                # Update existing card
+                card = existing_card
+                card.update(card_input.model_dump(exclude_unset=True))
+                card["updated_at"] = datetime.now().isoformat()
+            else:
+                # Create new card
+                card = card_input.model_dump()
+                card["id"] = str(uuid.uuid4())
+                card["user_id"] = user_id
+                card["share_slug"] = generate_share_slug(card_input.full_name)
+                card["created_at"] = datetime.now().isoformat()
+                card["updated_at"] = datetime.now().isoformat()
+
+            save_business_card(user_id, card)
+        return card
+
+    card = await asyncio.to_thread(save)
     return {"success": True, "card": card}
 
 
@@ -1158,7 +5169,6 @@ async def get_business_card_vcard(user_id: Optional[str] = Depends(get_user_id_f
 
     vcard_content = generate_vcard(card)
 
-    from fastapi.responses import Response
     return Response(
         content=vcard_content,
         media_type="text/vcard",
@@ -1180,22 +5190,19 @@ async def get_public_business_card(share_slug: str):
 
     # Fallback to file-based storage for legacy cards
     if not card_data:
-        users_dir = os.path.join(DATA_DIR, "users")
-        if os.path.exists(users_dir):
-            for user_id in os.listdir(users_dir):
-                user_dir = os.path.join(users_dir, user_id)
-                card_file = os.path.join(user_dir, "business_card.json")
-
-                if os.path.exists(card_file):
-                    try:
-                        with open(card_file, "r") as f:
-                            card = json.load(f)
-                            if card.get("share_slug") == share_slug:
-                                card_data = card
-                                break
-                    except Exception as e:
-                        print(f"Error reading card file: {e}")
-                        continue
+        for _, user_dir in iter_user_dirs():
+            card_file = os.path.join(user_dir, "business_card.json")
+
+            if os.path.exists(card_file):
+                try:
+                    with open(card_file, "r") as f:
+                        card = json.load(f)
+                        if card.get("share_slug") == share_slug:
+                            card_data = card
+                            break
+                except Exception as e:
+                    log_event(logging.WARNING, "Error reading card file", error=str(e))
+                    continue
 
     if not card_data:
         return HTMLResponse(content="""
@@ -1551,4 +5558,4 @@ async def get_public_business_card(share_slug: str):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", "8000")))
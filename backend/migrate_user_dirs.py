@@ -0,0 +1,45 @@
+"""Move per-user data directories into the sharded layout.
+
+users/<user_id>/ becomes users/<ab>/<cd>/<user_id>/ (see main.sharded_user_dir).
+Safe to run while API workers are serving traffic: each user is moved with
+a single rename under their lock, and workers keep using the old path until
+the move, then re-resolve it. Interrupt and re-run at any time.
+
+Usage:  python migrate_user_dirs.py [--dry-run] [--limit N]
+"""
+import argparse
+import logging
+import time
+
+import main
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="only count the users still in the flat layout")
+    parser.add_argument("--limit", type=int, default=0, help="stop after moving this many users")
+    args = parser.parse_args()
+
+    legacy = [user_id for user_id, path in main.iter_user_dirs() if path == main.legacy_user_dir(user_id)]
+    print(f"{len(legacy)} user directories in the flat layout under {main.DATA_DIR}")
+    if args.dry_run:
+        return
+
+    moved = failed = 0
+    start = time.perf_counter()
+    for user_id in legacy:
+        if args.limit and moved >= args.limit:
+            break
+        try:
+            if main.migrate_user_dir(user_id):
+                moved += 1
+        except OSError as e:
+            failed += 1
+            main.log_event(logging.ERROR, "User directory migration failed", user_id=user_id, error=str(e))
+        if moved and moved % 1000 == 0:
+            print(f"{moved} moved ({moved / (time.perf_counter() - start):.0f}/s)")
+    print(f"Moved {moved}, failed {failed} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -249,11 +249,10 @@ export default function FindContactScreen() {
       if (path) {
         setIsTranscribing(true);
         try {
-          const transcribeResult = await api.transcribeAudio(path);
-          if (transcribeResult.text) {
-            setQuery(transcribeResult.text);
-            setIsSearching(true);
-            const searchResult = await api.voiceSearch(transcribeResult.text, true);
+          setIsSearching(true);
+          const searchResult = await api.voiceSearchAudio(path);
+          if (searchResult.transcript) {
+            setQuery(searchResult.transcript);
 
             if (searchResult.results) {
               const formattedResults: SearchResult[] = searchResult.results.map((contact) => ({
@@ -133,6 +133,29 @@ export async function voiceSearch(query: string, useAgent: boolean = true): Prom
   });
 }
 
+// Voice search from a recording - transcription and search in one request
+export async function voiceSearchAudio(audioUri: string): Promise<{
+  transcript: string;
+  success: boolean;
+  results: Contact[];
+  explanation?: string;
+  source: 'agent' | 'simple';
+}> {
+  const formData = new FormData();
+
+  const filename = audioUri.split('/').pop() || 'recording.mp4';
+  const ext = filename.split('.').pop()?.toLowerCase() || 'mp4';
+  const mimeType = ext === 'aac' ? 'audio/aac' : ext === 'm4a' ? 'audio/m4a' : 'audio/mp4';
+
+  formData.append('audio', {
+    uri: audioUri,
+    name: filename,
+    type: mimeType,
+  } as any);
+
+  return apiFormRequest('/api/voice-search/audio', formData);
+}
+
 // OCR API - Business card text extraction
 export async function extractCardText(imageUri: string): Promise<{ text: string }> {
   const formData = new FormData();
@@ -198,6 +221,27 @@ export async function getCurrentUser(): Promise<{ authenticated: boolean; user_i
   return apiRequest('/api/me');
 }
 
+// Everything needed at app start in one round trip
+export async function bootstrap(contactsLimit: number = 0): Promise<{
+  user: { authenticated: boolean; user_id: string | null };
+  preferences: {
+    industry: string | null;
+    custom_tags: string[];
+    suggested_tags: string[];
+  };
+  tags: Array<{
+    tag: string;
+    count: number;
+    source: 'custom' | 'suggested' | 'contact' | 'default';
+  }>;
+  business_card: BusinessCard | null;
+  contacts: { contacts: Contact[]; next_cursor: string | null } | null;
+  etags: Record<string, string>;
+}> {
+  const query = contactsLimit > 0 ? `?contacts_limit=${contactsLimit}` : '';
+  return apiRequest(`/api/bootstrap${query}`);
+}
+
 // Migrate contacts to current user's account
 export async function migrateContacts(): Promise<{
   success: boolean;